@@ -1,19 +1,122 @@
 from abc import ABC, abstractmethod
-from groq import Groq
 from config import get_settings
+from . import prompts
+from .cache import LLMCachePolicy, content_hash, get_llm_cache
+from .compact import MAX_OUTPUT_TOKENS, compact_json, estimate_tokens, schema_outline, schema_token_budget
+from .governor import get_llm_governor
+from .json_stream import JSONStreamParser, repair_json
+from .validation import check_output
+from metrics import LLM_CALLS, LLM_COMPLETION_TOKENS, LLM_LATENCY, LLM_PROMPT_TOKENS
+from collections import defaultdict
+from pathlib import Path
+from pydantic import BaseModel
+from typing import TYPE_CHECKING, Callable
+import httpx
 import json
-import re
+import time
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+# Any edit to prompts.py invalidates every cached LLM response
+PROMPTS_VERSION = content_hash(Path(prompts.__file__).read_bytes())[:12]
+
+# One pooled keep-alive client shared by every agent in the process
+_llm_client: "AsyncGroq | None" = None
+
+def get_llm_client() -> "AsyncGroq":
+    global _llm_client
+    if _llm_client is None:
+        # Imported on first use; the SDK is a noticeable share of cold start
+        from groq import AsyncGroq
+        settings = get_settings()
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_keepalive_connections
+            ),
+            timeout=settings.llm_timeout
+        )
+        # Retries are owned by the governor, which also honours Retry-After
+        _llm_client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            base_url=settings.groq_base_url or None,
+            http_client=http_client,
+            max_retries=0
+        )
+    return _llm_client
+
+async def close_llm_client():
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+
+# Per-agent counters for LLM calls that reached the API (cache hits excluded)
+_usage: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+def record_usage(agent: str, **counts: float):
+    for key, value in counts.items():
+        _usage[agent][key] += value
+
+def get_usage() -> dict[str, dict[str, float]]:
+    """Totals and per-call averages of prompt size, output size and latency."""
+    report = {}
+    for agent, counts in _usage.items():
+        calls = counts.get("calls", 0)
+        report[agent] = dict(counts)
+        if calls:
+            report[agent]["avg_input_tokens"] = round(counts["input_tokens"] / calls, 1)
+            report[agent]["avg_latency"] = round(counts["latency"] / calls, 4)
+        if counts.get("parses"):
+            report[agent]["parse_failure_rate"] = round(counts.get("parse_failures", 0) / counts["parses"], 4)
+    return report
+
+def _chunk_text(chunk) -> str:
+    if not chunk.choices:
+        return ""
+    delta = getattr(chunk.choices[0], "delta", None)
+    if isinstance(delta, dict):
+        return delta.get("content") or ""
+    return getattr(delta, "content", None) or ""
+
+class _ItemForwarder:
+    """Forwards streamed items, skipping those a retried attempt already delivered."""
+    
+    def __init__(self, on_item: Callable[[dict], None] | None):
+        self.on_item = on_item
+        self.delivered = 0
+        self.position = 0
+    
+    def restart(self):
+        self.position = 0
+    
+    def __call__(self, item: dict):
+        self.position += 1
+        if self.position > self.delivered and self.on_item is not None:
+            self.delivered = self.position
+            self.on_item(item)
+
+async def _close_stream(stream):
+    # Closing the HTTP response is what stops the server generating
+    response = getattr(stream, "response", None)
+    close = getattr(response, "aclose", None) or getattr(stream, "aclose", None)
+    if close is not None:
+        await close()
 
 class BaseAgent(ABC):
+    # Subclasses opt in to LLM response caching by setting a policy
+    cache_policy: LLMCachePolicy | None = None
+    # Shape of the JSON reply; sizes the completion budget
+    output_model: type[BaseModel] | None = None
+    output_fields: set[str] | None = None
+    
     def __init__(self):
         self.settings = get_settings()
-        self._client = None
     
     @property
-    def client(self):
-        if self._client is None:
-            self._client = Groq(api_key=self.settings.groq_api_key)
-        return self._client
+    def client(self) -> "AsyncGroq":
+        return get_llm_client()
     
     @property
     @abstractmethod
@@ -25,35 +128,205 @@ class BaseAgent(ABC):
     def temperature(self) -> float:
         pass
     
+    @property
+    def max_output_tokens(self) -> int:
+        if self.output_model is None:
+            return MAX_OUTPUT_TOKENS
+        return schema_token_budget(self.output_model, self.output_fields)
+    
+    @property
+    def output_outline(self) -> str:
+        """JSON shape of the reply, generated from ``output_model`` for the prompt."""
+        return schema_outline(self.output_model, self.output_fields)
+    
     @abstractmethod
     async def execute(self, **kwargs) -> dict:
         pass
     
-    def _call_llm(self, prompt: str, system_prompt: str = "") -> str:
+    async def _call_llm(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        item_key: str | None = None,
+        on_item: Callable[[dict], None] | None = None
+    ) -> str:
+        """Return the model's reply, passing each object of the ``item_key`` array to ``on_item`` as it completes."""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
-        response = self.client.chat.completions.create(
+        cache_key = self._llm_cache_key(messages)
+        if cache_key:
+            cached = get_llm_cache().get(cache_key)
+            if cached is not None:
+                if on_item is not None:
+                    for item in JSONStreamParser(item_key).feed(cached):
+                        on_item(item)
+                return cached
+        
+        governor = get_llm_governor()
+        reserved = sum(estimate_tokens(m["content"]) for m in messages) + self.max_output_tokens
+        # JSON mode already ends the reply at the object's close, so streaming
+        # is only worth it when items are consumed as they arrive
+        json_mode = self.settings.llm_json_mode and self.output_model is not None
+        start = time.perf_counter()
+        if self.settings.llm_streaming and (on_item is not None or not json_mode):
+            forward = _ItemForwarder(on_item)
+            content, usage, complete = await governor.run(
+                self.model, reserved, lambda: self._stream_llm(messages, item_key, forward)
+            )
+        else:
+            response = await governor.run(
+                self.model,
+                reserved,
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_output_tokens,
+                    **({"response_format": {"type": "json_object"}} if json_mode else {})
+                )
+            )
+            choice = response.choices[0]
+            content, usage = choice.message.content, getattr(response, "usage", None)
+            complete = getattr(choice, "finish_reason", None) != "length"
+            if on_item is not None:
+                for item in JSONStreamParser(item_key).feed(content or ""):
+                    on_item(item)
+        used = self._record_call(messages, usage, content, time.perf_counter() - start)
+        governor.refund(self.model, reserved - used)
+        
+        # Only replies that were read to the end and validate are worth replaying
+        if cache_key and complete and self._is_valid_reply(content):
+            get_llm_cache().set(cache_key, content, ttl=self.cache_policy.ttl)
+        return content
+    
+    async def _stream_llm(
+        self,
+        messages: list[dict],
+        item_key: str | None,
+        forward: _ItemForwarder
+    ) -> tuple[str, object, bool]:
+        """Stream a completion and stop as soon as the top-level JSON object closes.
+        
+        Also reports whether the object did close; a reply cut off at
+        ``max_tokens`` ends with it still open.
+        """
+        forward.restart()
+        parser = JSONStreamParser(item_key)
+        parts = []
+        stream = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             temperature=self.temperature,
-            max_tokens=4096
+            max_tokens=self.max_output_tokens,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                text = _chunk_text(chunk)
+                parts.append(text)
+                for item in parser.feed(text):
+                    forward(item)
+                if parser.done:
+                    break
+        finally:
+            await _close_stream(stream)
+        # Usage only arrives on the final chunk, which an early stop never reads
+        return (parser.text if parser.done else "".join(parts)), None, parser.done
+    
+    def _record_call(self, messages: list[dict], usage, content: str | None, latency: float) -> int:
+        # Prefer the token counts the API reports; estimate when it does not
+        input_tokens = getattr(usage, "prompt_tokens", None)
+        output_tokens = getattr(usage, "completion_tokens", None)
+        if input_tokens is None:
+            input_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        if output_tokens is None:
+            output_tokens = estimate_tokens(content or "")
+        agent = type(self).__name__
+        LLM_CALLS.inc(agent, self.model)
+        LLM_PROMPT_TOKENS.inc(agent, self.model, amount=input_tokens)
+        LLM_COMPLETION_TOKENS.inc(agent, self.model, amount=output_tokens)
+        LLM_LATENCY.observe(agent, self.model, value=latency)
+        record_usage(
+            agent,
+            calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency=latency
         )
-        return response.choices[0].message.content
+        return input_tokens + output_tokens
+    
+    def _llm_cache_key(self, messages: list[dict]) -> str | None:
+        policy = self.cache_policy
+        if not self.settings.llm_cache_enabled or policy is None or not policy.allows(self.temperature):
+            return None
+        return content_hash(json.dumps([PROMPTS_VERSION, self.model, self.temperature, messages]))
+    
+    def _is_valid_reply(self, content: str | None) -> bool:
+        try:
+            data, _ = repair_json(content or "")
+        except ValueError:
+            return False
+        if self.output_model is None:
+            return True
+        return isinstance(data, dict) and not check_output(self.output_model, data, self.output_fields)[1]
     
     def _parse_json(self, text: str) -> dict:
         """Extract JSON from LLM response."""
-        text = text.strip()
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', text)
-        if json_match:
-            text = json_match.group(1)
+        return repair_json(text)[0]
+    
+    async def _parse_output(self, response: str) -> dict:
+        """Parse a reply and validate it against ``output_model``.
+        
+        Malformed JSON is repaired locally. Fields that still fail
+        validation are re-asked once in a short follow-up that carries only
+        the offending values, never the original prompt; valid list items
+        are kept. Invalid optional fields fall back to their defaults.
+        """
+        agent = type(self).__name__
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(text[start:end])
-            raise ValueError("Could not parse JSON from response")
+            data, repaired = repair_json(response or "")
+        except ValueError:
+            data, repaired = None, False
+        if self.output_model is None:
+            record_usage(agent, parses=1, parse_failures=int(data is None))
+            if data is None:
+                raise ValueError("Could not parse JSON from response")
+            return data
+        
+        valid, errors, rejected = check_output(self.output_model, data or {}, self.output_fields)
+        failed = data is None or bool(errors)
+        record_usage(agent, parses=1, parse_failures=int(failed), repairs=int(repaired))
+        if not failed:
+            return valid
+        
+        fields = set(errors) if data is not None else self.output_fields
+        if data is None:
+            problems = f"It was not valid JSON:\n{(response or '')[:2000]}"
+        else:
+            problems = "\n".join(
+                f"- {name}: {message}; got {compact_json(rejected[name])[:500]}" for name, message in errors.items()
+            )
+        prompt = prompts.REPAIR_PROMPT.format(problems=problems, outline=schema_outline(self.output_model, fields))
+        record_usage(agent, reasks=1)
+        try:
+            fixed, _ = repair_json(await self._call_llm(prompt, system_prompt="Return only valid JSON."))
+        except ValueError:
+            fixed = {}
+        
+        fixed_valid, still_invalid, _ = check_output(self.output_model, fixed, fields)
+        for name, value in fixed_valid.items():
+            if isinstance(value, list) and isinstance(valid.get(name), list):
+                valid[name] = valid[name] + value
+            else:
+                valid[name] = value
+        missing = [
+            name for name in still_invalid
+            if self.output_model.model_fields[name].is_required() and name not in valid
+        ]
+        if missing:
+            record_usage(agent, reask_failures=1)
+            raise ValueError(f"LLM returned invalid fields: {', '.join(missing)}")
+        return valid
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from config import get_settings
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+def content_hash(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+class LRUCache:
+    """In-memory LRU of string values bounded by total size in bytes.
+
+    ``max_entries`` additionally caps the entry count and ``ttl`` expires
+    entries that many seconds after they were stored. When ``disk_dir`` is
+    set, entries are also written through to one file per key so they
+    survive restarts; a memory miss falls back to disk and promotes the
+    entry back into memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: str | Path | None = None,
+        namespace: str = "default",
+        max_entries: int | None = None,
+        ttl: float | None = None
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.namespace = namespace
+        self.disk_dir = Path(disk_dir) / namespace if disk_dir else None
+        # key -> (value, size in bytes, expiry timestamp or None)
+        self._data: OrderedDict[str, tuple[str, int, float | None]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self._bytes -= size
+
+        value, expires_at = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, expires_at)
+        return value
+
+    def set(self, key: str, value: str, ttl: float | None = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._store(key, value, expires_at)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def _store(self, key: str, value: str, expires_at: float | None = None):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        self._data[key] = (value, size, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._data) > self.max_entries
+        ):
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        name = content_hash(key)
+        return self.disk_dir / name[:2] / name
+
+    def _read_disk(self, key: str) -> tuple[str | None, float | None]:
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            expires_at = path.stat().st_mtime + self.ttl if self.ttl is not None else None
+            if expires_at is not None and expires_at <= time.time():
+                return None, None
+            return path.read_text(encoding="utf-8"), expires_at
+        except OSError:
+            return None, None
+
+    def _write_disk(self, key: str, value: str):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+@dataclass(frozen=True)
+class LLMCachePolicy:
+    """Per-agent rules for reusing LLM responses.
+
+    Responses are only reused when the agent's temperature is at or below
+    ``max_temperature``; agents whose output is acceptable to repeat at a
+    higher temperature can raise it. ``ttl`` overrides the global TTL.
+    """
+    enabled: bool = True
+    max_temperature: float = 0.3
+    ttl: float | None = None
+
+    def allows(self, temperature: float) -> bool:
+        return self.enabled and temperature <= self.max_temperature
+
+_llm_cache: LRUCache | None = None
+
+def get_llm_cache() -> LRUCache:
+    global _llm_cache
+    if _llm_cache is None:
+        settings = get_settings()
+        _llm_cache = LRUCache(
+            settings.llm_cache_max_bytes,
+            namespace="llm_response",
+            max_entries=settings.llm_cache_max_entries,
+            ttl=settings.llm_cache_ttl
+        )
+    return _llm_cache
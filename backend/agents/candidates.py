@@ -0,0 +1,236 @@
+from contextlib import contextmanager
+from pathlib import Path
+from config import get_settings
+from models.schemas import ParsedResume, JDAnalysis
+from .cache import content_hash
+from .registry import get_embedder
+from .scoring import normalize, resume_terms
+from metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_LATENCY
+import base64
+import hashlib
+import json
+import numpy as np
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: the pool is then only safe within one process
+    fcntl = None
+
+# Pre-ranking weights: skill overlap and keyword coverage as in the ATS
+# score, plus semantic similarity for candidates who phrase things differently
+RANK_WEIGHTS = {"skills": 0.5, "keywords": 0.2, "similarity": 0.3}
+
+def term_hash(term: tuple[str, ...]) -> int:
+    """Stable 64-bit id of a normalized term, identical across processes."""
+    digest = hashlib.blake2b("\x1f".join(term).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+def candidate_text(resume: ParsedResume) -> str:
+    skills = resume.skills
+    titles = [job.title for job in resume.experience]
+    bullets = [bullet for job in resume.experience for bullet in job.bullets]
+    return " ".join(titles + skills.languages + skills.frameworks + skills.tools + [resume.summary] + bullets)
+
+def jd_text(jd: JDAnalysis) -> str:
+    return " ".join([jd.title] + jd.required_skills + jd.preferred_skills + jd.responsibilities)
+
+class CandidateStore:
+    """Pool of parsed resumes ranked against a job description without the LLM.
+
+    Each candidate keeps its ``ParsedResume``, an L2-normalized embedding
+    and the hashed set of normalized terms the local scorer matches
+    against. All candidates' terms sit in one flat array with a parallel
+    owner array, so skill overlap for a whole pool is a single ``isin``
+    plus ``bincount``.
+
+    With a ``path``, every add is appended to ``candidates.jsonl`` under an
+    exclusive file lock before it returns, so nothing waits for shutdown
+    and several worker processes can share one pool. Each process picks up
+    the others' candidates by reading only the tail of the log.
+    """
+
+    def __init__(self, embedder=None, path: str | Path | None = None):
+        self._embedder = embedder
+        self._log_path = self._lock_path = None
+        if path:
+            Path(path).mkdir(parents=True, exist_ok=True)
+            self._log_path = Path(path) / "candidates.jsonl"
+            self._lock_path = Path(path) / "lock"
+        self._log_offset = 0
+        self._lock = threading.RLock()
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._resumes: list[ParsedResume] = []
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._terms = np.empty(0, dtype=np.int64)
+        self._owners = np.empty(0, dtype=np.int32)
+        # Batches appended since the last ranking; concatenated lazily
+        self._pending: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def embedder(self):
+        return self._embedder if self._embedder is not None else get_embedder()
+
+    def add(self, resumes: list[ParsedResume]) -> list[str]:
+        """Store resumes and return their ids; re-adding an identical resume is a no-op."""
+        ids = [content_hash(resume.model_dump_json()) for resume in resumes]
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            fresh = list({i: r for i, r in zip(ids, resumes) if i not in self._rows}.items())
+        if not fresh:
+            return ids
+
+        start = time.perf_counter()
+        vectors = np.asarray(
+            self.embedder.encode([candidate_text(r) for _, r in fresh], normalize_embeddings=True),
+            dtype=np.float32
+        )
+        EMBEDDING_BATCH_SIZE.observe("candidates", value=len(fresh))
+        EMBEDDING_LATENCY.observe("candidates", value=time.perf_counter() - start)
+
+        with self._lock, self._file_lock(shared=False):
+            self._refresh()
+            # Another thread or worker may have stored some of these while we embedded
+            entries = [(i, r, v) for (i, r), v in zip(fresh, vectors) if i not in self._rows]
+            if entries and self._log_path is not None:
+                lines = "".join(
+                    json.dumps({"id": i, "resume": r.model_dump(), "vector": base64.b64encode(v.tobytes()).decode()}) + "\n"
+                    for i, r, v in entries
+                ).encode("utf-8")
+                with open(self._log_path, "ab") as f:
+                    if f.tell() > self._log_offset:
+                        # A writer crashed mid-line; end that line so ours parse
+                        lines = b"\n" + lines
+                    f.write(lines)
+                    self._log_offset = f.tell()
+            self._append(entries)
+        return ids
+
+    def get(self, candidate_id: str) -> ParsedResume | None:
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            row = self._rows.get(candidate_id)
+            return self._resumes[row] if row is not None else None
+
+    def rank(self, jd: JDAnalysis, k: int = 10) -> list[tuple[str, ParsedResume, dict]]:
+        """Top ``k`` candidates by local score, best first, with their score breakdown."""
+        jd_vector = np.asarray(self.embedder.encode([jd_text(jd)], normalize_embeddings=True)[0], dtype=np.float32)
+        required = np.array(sorted({term_hash(t) for t in map(normalize, jd.required_skills) if t}), dtype=np.int64)
+        keywords = np.array(sorted({term_hash(t) for t in map(normalize, jd.ats_keywords) if t}), dtype=np.int64)
+
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            self._consolidate()
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            skills = self._coverage(required, n)
+            coverage = self._coverage(keywords, n)
+            similarity = np.clip(self._vectors @ jd_vector, 0.0, 1.0)
+            scores = (
+                RANK_WEIGHTS["skills"] * skills
+                + RANK_WEIGHTS["keywords"] * coverage
+                + RANK_WEIGHTS["similarity"] * similarity
+            )
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (self._ids[row], self._resumes[row], {
+                    "score": round(float(scores[row]) * 100, 1),
+                    "skill_overlap_percent": round(float(skills[row]) * 100, 1),
+                    "keyword_coverage": round(float(coverage[row]) * 100, 1),
+                    "similarity": round(float(similarity[row]), 4)
+                })
+                for row in top
+            ]
+
+    def _append(self, entries: list[tuple[str, ParsedResume, np.ndarray]]):
+        if not entries:
+            return
+        term_sets = [{term_hash(t) for t in resume_terms(r)[0]} for _, r, _ in entries]
+        start = len(self._ids)
+        for offset, (candidate_id, resume, _) in enumerate(entries):
+            self._rows[candidate_id] = start + offset
+            self._ids.append(candidate_id)
+            self._resumes.append(resume)
+        vectors = np.stack([v for _, _, v in entries]).astype(np.float32, copy=False)
+        owners = np.repeat(np.arange(start, start + len(entries), dtype=np.int32), [len(s) for s in term_sets])
+        terms = np.fromiter((h for s in term_sets for h in s), dtype=np.int64, count=len(owners))
+        self._pending.append((vectors, terms, owners))
+
+    def _refresh(self):
+        """Load candidates other processes appended to the log since the last read."""
+        if self._log_path is None:
+            return
+        try:
+            size = self._log_path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._log_offset:
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read(size - self._log_offset)
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        self._log_offset += len(complete)
+        entries = {}
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # What is left of a line cut short by a crash
+                continue
+            if record["id"] not in self._rows:
+                vector = np.frombuffer(base64.b64decode(record["vector"]), dtype=np.float32)
+                entries[record["id"]] = (record["id"], ParsedResume(**record["resume"]), vector)
+        self._append(list(entries.values()))
+
+    @contextmanager
+    def _file_lock(self, shared: bool):
+        if fcntl is None or self._lock_path is None:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _coverage(self, wanted: np.ndarray, n: int) -> np.ndarray:
+        # Fraction of wanted terms each candidate has; an empty list counts as fully covered
+        if len(wanted) == 0:
+            return np.ones(n, dtype=np.float32)
+        hits = np.isin(self._terms, wanted, assume_unique=False)
+        return np.bincount(self._owners[hits], minlength=n)[:n].astype(np.float32) / len(wanted)
+
+    def _consolidate(self):
+        if not self._pending:
+            return
+        vectors, terms, owners = zip(*self._pending)
+        if self._vectors.size:
+            vectors = (self._vectors,) + vectors
+        self._vectors = np.concatenate(vectors)
+        self._terms = np.concatenate((self._terms,) + terms)
+        self._owners = np.concatenate((self._owners,) + owners)
+        self._pending = []
+
+_candidate_store: CandidateStore | None = None
+_candidate_store_lock = threading.Lock()
+
+def get_candidate_store() -> CandidateStore:
+    """Shared recruiter candidate pool, persisted under candidate_store_path when one is set."""
+    global _candidate_store
+    if _candidate_store is None:
+        with _candidate_store_lock:
+            if _candidate_store is None:
+                _candidate_store = CandidateStore(path=get_settings().candidate_store_path or None)
+    return _candidate_store
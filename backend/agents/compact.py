@@ -0,0 +1,117 @@
+from .scoring import normalize, term_ngrams
+from models.schemas import ParsedResume, JDAnalysis
+from enum import Enum
+from pydantic import BaseModel
+from typing import get_args, get_origin
+import json
+
+# Contact details never help the model reason about fit
+PII_FIELDS = {"name", "email", "phone", "linkedin", "location"}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English and JSON)."""
+    return (len(text) + 3) // 4
+
+# Output budget assumptions: strings run to a sentence, lists to a handful of entries
+STRING_TOKENS = 24
+LIST_ITEMS = 6
+MAX_OUTPUT_TOKENS = 4096
+
+def schema_token_budget(model: type[BaseModel], include: set[str] | None = None) -> int:
+    """Completion budget for a JSON reply shaped like ``model``, with 25% headroom."""
+    tokens = sum(
+        estimate_tokens(name) + 2 + _annotation_tokens(field.annotation)
+        for name, field in model.model_fields.items()
+        if include is None or name in include
+    )
+    return min(MAX_OUTPUT_TOKENS, int(tokens * 1.25) + 16)
+
+def _annotation_tokens(annotation) -> int:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return schema_token_budget(annotation)
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (str,)
+        return LIST_ITEMS * (_annotation_tokens(item) + 1)
+    args = [a for a in get_args(annotation) if a is not type(None)]
+    if args:
+        return _annotation_tokens(args[0])
+    return STRING_TOKENS if annotation is str else 4
+
+def schema_outline(model: type[BaseModel], include: set[str] | None = None) -> str:
+    """Compact JSON sketch of a model's fields, for telling the LLM what shape to return."""
+    outline = {
+        name: _outline(field.annotation, field.metadata)
+        for name, field in model.model_fields.items()
+        if include is None or name in include
+    }
+    return json.dumps(outline, separators=(",", ":"))
+
+def _outline(annotation, metadata=()):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return json.loads(schema_outline(annotation))
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return "|".join(str(member.value) for member in annotation)
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (str,)
+        return [_outline(item)]
+    args = [a for a in get_args(annotation) if a is not type(None)]
+    if args:
+        return _outline(args[0], metadata) + "|null"
+    name = getattr(annotation, "__name__", "str")
+    bounds = [str(getattr(m, attr)) for m in metadata for attr in ("ge", "le") if hasattr(m, attr)]
+    return f"{name} {'-'.join(bounds)}" if bounds else name
+
+def prune(value):
+    """Drop None, empty strings, lists and dicts at any depth."""
+    if isinstance(value, dict):
+        pruned = {k: prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+def compact_json(value) -> str:
+    return json.dumps(prune(value), separators=(",", ":"), ensure_ascii=False)
+
+def compact_jd(jd: JDAnalysis) -> str:
+    return compact_json(jd.model_dump(exclude={"benefits"}))
+
+def compact_resume(
+    resume: ParsedResume,
+    jd: JDAnalysis,
+    budget: int | None = None,
+    reserved: int = 0
+) -> tuple[str, int]:
+    """Serialize a resume without PII, trimming bullets until the prompt fits ``budget`` tokens.
+
+    ``reserved`` is the token cost of the rest of the prompt. Bullets that
+    mention the fewest JD terms go first, oldest roles before recent ones.
+    Returns the JSON and the number of bullets dropped.
+    """
+    data = prune(resume.model_dump(exclude=PII_FIELDS))
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    over = estimate_tokens(text) + reserved - budget if budget is not None else 0
+    if over <= 0:
+        return text, 0
+
+    terms = {normalize(t) for t in jd.required_skills + jd.preferred_skills + jd.ats_keywords}
+    terms.discard(())
+    candidates = []
+    # Resumes list roles newest first, so a higher index is an older role
+    for role, job in enumerate(data.get("experience", [])):
+        for i, bullet in enumerate(job.get("bullets", [])):
+            relevance = len(terms & term_ngrams(bullet))
+            candidates.append((relevance, -role, -i, role, i, bullet))
+
+    over_chars = over * 4
+    dropped = set()
+    for *_, role, i, bullet in sorted(candidates):
+        if over_chars <= 0:
+            break
+        dropped.add((role, i))
+        over_chars -= len(json.dumps(bullet, ensure_ascii=False)) + 1
+    for role, job in enumerate(data.get("experience", [])):
+        job["bullets"] = [b for i, b in enumerate(job.get("bullets", [])) if (role, i) not in dropped]
+
+    return compact_json(data), len(dropped)
@@ -0,0 +1,287 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Iterator
+from config import get_settings
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import weakref
+
+# Extractors run inside pool workers, so they are plain module-level functions
+# and import the document libraries lazily.
+
+def extract_text(content: bytes, ext: str, max_pages: int | None = None, max_chars: int | None = None) -> str:
+    if ext == 'pdf':
+        return extract_pdf(content, max_pages, max_chars)
+    elif ext in ['docx', 'doc']:
+        return extract_docx(content, max_chars)
+    elif ext == 'txt':
+        return content.decode('utf-8', errors='ignore')[:max_chars]
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+def preload_extractors() -> int:
+    """Import every document library in this process; run in pool workers to warm them up."""
+    import fitz  # pymupdf
+    import pdfplumber
+    from docx import Document
+    return os.getpid()
+
+def extract_pdf(content: bytes, max_pages: int | None = None, max_chars: int | None = None) -> str:
+    return "\n".join(iter_pdf_pages(content, max_pages, max_chars))
+
+def iter_pdf_pages(content: bytes, max_pages: int | None = None, max_chars: int | None = None) -> Iterator[str]:
+    """Yield page texts in one pass over the document.
+
+    PyMuPDF extracts every page; only pages it handles badly (empty,
+    multi-column or table-heavy) are re-read with pdfplumber's layout
+    mode. Extraction stops once ``max_pages`` pages or ``max_chars``
+    characters have been produced.
+    """
+    import fitz  # pymupdf
+
+    try:
+        doc = fitz.open(stream=content, filetype="pdf")
+    except Exception:
+        # PyMuPDF could not open it at all; let pdfplumber try the whole file
+        yield from _iter_pdfplumber_pages(content, max_pages, max_chars)
+        return
+
+    plumber = None
+    remaining = max_chars
+    try:
+        for number, page in enumerate(doc):
+            if max_pages is not None and number >= max_pages:
+                break
+            textpage = page.get_textpage()
+            text = page.get_text(textpage=textpage)
+            if not text.strip() or _needs_layout(page, textpage):
+                if plumber is None:
+                    plumber = _open_pdfplumber(content)
+                if plumber is not None:
+                    layout = plumber.pages[number].extract_text(layout=True) or ""
+                    # Layout mode pads to page width; keep the alignment, drop the padding
+                    layout = "\n".join(line.rstrip() for line in layout.splitlines() if line.strip())
+                    text = layout or text
+            if remaining is not None:
+                text = text[:remaining]
+                remaining -= len(text)
+            if text:
+                yield text
+            if remaining is not None and remaining <= 0:
+                break
+    finally:
+        doc.close()
+        if plumber is not None:
+            plumber.close()
+
+def _needs_layout(page, textpage) -> bool:
+    # Words come from the text page already extracted, not a second pass
+    if _is_multi_column(page.get_text("words", textpage=textpage), page.rect.width):
+        return True
+    # Ruled tables show up as many vector line drawings
+    return len(page.get_drawings()) >= 20
+
+def _is_multi_column(words: list, width: float, bins: int = 50) -> bool:
+    """Detect an empty vertical gutter in the middle of the page with text on both sides."""
+    if len(words) < 20 or width <= 0:
+        return False
+    coverage = [0] * bins
+    for x0, _, x1, *_ in words:
+        for b in range(max(0, int(x0 / width * bins)), min(bins, int(x1 / width * bins) + 1)):
+            coverage[b] += 1
+    # A header spanning both columns may cross the gutter
+    threshold = max(1, len(words) // 50)
+    has_gutter = any(coverage[b] <= threshold for b in range(int(bins * 0.3), int(bins * 0.7)))
+    left = sum(1 for w in words if w[2] < width / 2)
+    right = sum(1 for w in words if w[0] > width / 2)
+    return has_gutter and min(left, right) >= len(words) * 0.2
+
+def _open_pdfplumber(content: bytes):
+    import pdfplumber
+
+    try:
+        return pdfplumber.open(BytesIO(content))
+    except Exception:
+        return None
+
+def _iter_pdfplumber_pages(content: bytes, max_pages: int | None, max_chars: int | None) -> Iterator[str]:
+    pdf = _open_pdfplumber(content)
+    if pdf is None:
+        raise ValueError("Could not extract text from PDF")
+    remaining = max_chars
+    with pdf:
+        for page in pdf.pages[:max_pages]:
+            text = (page.extract_text() or "")
+            if remaining is not None:
+                text = text[:remaining]
+                remaining -= len(text)
+            if text:
+                yield text
+            if remaining is not None and remaining <= 0:
+                break
+
+def extract_docx(content: bytes, max_chars: int | None = None) -> str:
+    from docx import Document
+
+    doc = Document(BytesIO(content))
+    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+
+    # Also extract from tables
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                if cell.text.strip():
+                    paragraphs.append(cell.text)
+
+    return "\n".join(paragraphs)[:max_chars]
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def _run_measured(fn, *args):
+    return fn(*args), _rss_bytes()
+
+def _report_pid(pids):
+    # Lets the parent terminate a hung worker without executor internals
+    pids.cancel_join_thread()
+    pids.put(os.getpid())
+
+class ExtractionPool:
+    """Bounded executor that keeps CPU-bound extraction off the event loop.
+
+    ``kind="process"`` runs work in a process pool whose workers are
+    replaced after ``max_tasks_per_worker`` documents, and the pool is
+    recycled as soon as a worker reports a resident size above
+    ``max_worker_memory`` bytes or a document exceeds ``timeout``. A
+    timeout terminates that pool's workers; documents running alongside
+    the timed-out one are resubmitted to the fresh pool rather than
+    failed. ``kind="thread"`` suits extractors that release the GIL;
+    timed-out threads cannot be stopped and are simply abandoned.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 30.0,
+        max_worker_memory: int = 512 * 1024 * 1024,
+        max_tasks_per_worker: int = 100,
+        kind: str = "process"
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.workers = workers
+        self.timeout = timeout
+        self.max_worker_memory = max_worker_memory
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.kind = kind
+        self.recycles = 0
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        # Worker pids reported by each process pool, and pools terminated on purpose
+        self._pid_queues: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._pids: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._terminated: weakref.WeakSet = weakref.WeakSet()
+
+    async def run(self, fn, *args):
+        # One retry: a pool terminated for another document's timeout is not this document's fault
+        for attempt in range(2):
+            executor = self._get_executor()
+            future = asyncio.get_running_loop().run_in_executor(executor, _run_measured, fn, *args)
+            try:
+                result, rss = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self._recycle(executor, kill=True)
+                raise ValueError(f"Text extraction timed out after {self.timeout:g}s")
+            except BrokenProcessPool:
+                if attempt == 0 and executor in self._terminated:
+                    continue
+                self._recycle(executor, kill=True)
+                raise ValueError("Text extraction worker crashed")
+
+            if self.kind == "process" and rss > self.max_worker_memory:
+                self._recycle(executor)
+            return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "thread":
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="extract")
+                else:
+                    # max_tasks_per_child requires the spawn start method
+                    context = multiprocessing.get_context("spawn")
+                    pids = context.Queue()
+                    self._executor = ProcessPoolExecutor(
+                        self.workers,
+                        mp_context=context,
+                        initializer=_report_pid,
+                        initargs=(pids,),
+                        max_tasks_per_child=self.max_tasks_per_worker
+                    )
+                    self._pid_queues[self._executor] = pids
+                    self._pids[self._executor] = set()
+            executor = self._executor
+        if executor in self._pid_queues:
+            self._worker_pids(executor)
+        return executor
+
+    def _worker_pids(self, executor: Executor) -> set[int]:
+        """Live worker pids of a process pool; also keeps the report queue drained."""
+        pids = self._pids[executor]
+        try:
+            while True:
+                pids.add(self._pid_queues[executor].get_nowait())
+        except queue.Empty:
+            pass
+        alive = {process.pid for process in multiprocessing.active_children()}
+        pids &= alive
+        return pids
+
+    def _recycle(self, executor: Executor, kill: bool = False):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.recycles += 1
+        if kill and executor in self._pid_queues:
+            self._terminated.add(executor)
+            for process in multiprocessing.active_children():
+                if process.pid in self._worker_pids(executor):
+                    process.terminate()
+        # In-flight documents on a merely oversized pool are allowed to finish;
+        # on a terminated one they fail with BrokenProcessPool and are resubmitted
+        executor.shutdown(wait=False)
+
+_pool: ExtractionPool | None = None
+
+def get_extraction_pool() -> ExtractionPool:
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = ExtractionPool(
+            workers=settings.extraction_workers,
+            timeout=settings.extraction_timeout,
+            max_worker_memory=settings.extraction_max_worker_memory_mb * 1024 * 1024,
+            max_tasks_per_worker=settings.extraction_max_tasks_per_worker,
+            kind=settings.extraction_executor
+        )
+    return _pool
+
+def shutdown_extraction_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,215 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Awaitable, Callable, TypeVar
+from config import get_settings
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+T = TypeVar("T")
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+# Set by whoever starts the work; every LLM call made inside inherits it
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+@contextmanager
+def llm_priority(priority: Priority):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def retryable_errors() -> tuple[type[Exception], ...]:
+    # The SDK is already loaded once a call has failed; importing here keeps it off cold start
+    import groq
+    return (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds the server asked us to wait, if it said."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """Refills continuously at ``per_minute``; a zero limit never throttles."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        # A request larger than the bucket waits for a full bucket, then overdraws
+        needed = min(amount, self.capacity) - self.tokens
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity > 0:
+            self._refill()
+            self.tokens -= amount
+
+    def give(self, amount: float):
+        if self.capacity > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self):
+        if self.capacity > 0:
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class _Model:
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.waiters: list[tuple[int, int]] = []
+
+class LLMGovernor:
+    """Process-wide admission control in front of every LLM call.
+
+    Per model, a call waits until it is the highest-priority waiter, a
+    concurrency slot is free, and the request and token buckets can cover
+    it. Tokens are reserved from the estimate up front and the unused part
+    is refunded once the real usage is known. Rate-limit, connection and
+    5xx errors are retried with full-jitter exponential backoff, or after
+    the server's Retry-After, during which the whole model is paused.
+    """
+
+    def __init__(
+        self,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_concurrency: int = 20,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._models: dict[str, _Model] = {}
+        self._seq = itertools.count()
+        self._changed: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def run(self, model: str, tokens: int, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call`` under the limits of ``model``, reserving ``tokens`` of TPM."""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(model, tokens)
+            try:
+                return await call()
+            except retryable_errors() as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                else:
+                    # Everyone else on this model would hit the same limit
+                    state = self._models[model]
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                    state.tokens.drain()
+                    delay += random.uniform(0, 0.1 * delay)
+                self.retries += 1
+            finally:
+                await self._release(model)
+            await asyncio.sleep(delay)
+
+    def refund(self, model: str, tokens: float):
+        """Return reserved tokens the call did not use."""
+        if tokens > 0 and model in self._models:
+            self._models[model].tokens.give(tokens)
+
+    def in_flight(self, model: str) -> int:
+        state = self._models.get(model)
+        return state.in_flight if state else 0
+
+    async def _acquire(self, model: str, tokens: int):
+        changed = self._condition()
+        state = self._models.setdefault(model, _Model(self.rpm, self.tpm))
+        waiter = (int(_priority.get()), next(self._seq))
+        async with changed:
+            heapq.heappush(state.waiters, waiter)
+            try:
+                while True:
+                    wait = None
+                    if state.waiters[0] == waiter and state.in_flight < self.max_concurrency:
+                        wait = max(
+                            state.blocked_until - time.monotonic(),
+                            state.requests.wait_time(1),
+                            state.tokens.wait_time(tokens)
+                        )
+                        if wait <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                heapq.heappop(state.waiters)
+                state.requests.take(1)
+                state.tokens.take(tokens)
+                state.in_flight += 1
+            except BaseException:
+                if waiter in state.waiters:
+                    state.waiters.remove(waiter)
+                    heapq.heapify(state.waiters)
+                changed.notify_all()
+                raise
+            # The next waiter may now be at the head
+            changed.notify_all()
+
+    async def _release(self, model: str):
+        changed = self._condition()
+        async with changed:
+            self._models[model].in_flight -= 1
+            changed.notify_all()
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous event loop is gone
+            self._loop = loop
+            self._changed = asyncio.Condition()
+            for state in self._models.values():
+                state.in_flight = 0
+                state.waiters.clear()
+        return self._changed
+
+_governor: LLMGovernor | None = None
+
+def get_llm_governor() -> LLMGovernor:
+    global _governor
+    if _governor is None:
+        settings = get_settings()
+        _governor = LLMGovernor(
+            rpm=settings.llm_rpm,
+            tpm=settings.llm_tpm,
+            max_concurrency=settings.llm_max_concurrency_per_model,
+            max_retries=settings.llm_max_retries
+        )
+    return _governor
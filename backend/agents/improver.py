@@ -1,9 +1,16 @@
-from .base import BaseAgent
+from .base import BaseAgent, record_usage
+from .cache import LLMCachePolicy
+from .compact import compact_json, compact_jd, compact_resume, estimate_tokens
 from .prompts import IMPROVEMENT_PROMPT
-from models.schemas import ParsedResume, JDAnalysis, MatchResult, ImprovementSuggestions
-import json
+from models.schemas import ParsedResume, JDAnalysis, MatchResult, Improvement, ImprovementSuggestions
+from pydantic import ValidationError
+from typing import Callable
 
 class ImprovementAgent(BaseAgent):
+    # Suggestions vary run to run; repeating one for an hour is acceptable
+    cache_policy = LLMCachePolicy(max_temperature=1.0, ttl=60 * 60)
+    output_model = ImprovementSuggestions
+    
     @property
     def model(self) -> str:
         return self.settings.reasoning_model
@@ -16,18 +23,29 @@ class ImprovementAgent(BaseAgent):
         self, 
         resume: ParsedResume, 
         jd: JDAnalysis, 
-        match: MatchResult
+        match: MatchResult,
+        on_improvement: Callable[[Improvement], None] | None = None
     ) -> ImprovementSuggestions:
-        prompt = IMPROVEMENT_PROMPT.format(
-            resume_json=json.dumps(resume.model_dump(), indent=2),
-            jd_json=json.dumps(jd.model_dump(), indent=2),
-            match_json=json.dumps(match.model_dump(), indent=2)
-        )
+        """Suggest edits; ``on_improvement`` receives each one as soon as it is generated."""
+        context = {"outline": self.output_outline, "jd_json": compact_jd(jd), "match_json": compact_json(match.model_dump())}
+        reserved = estimate_tokens(IMPROVEMENT_PROMPT.format(resume_json="", **context))
+        resume_json, trimmed = compact_resume(resume, jd, self.settings.improvement_input_tokens, reserved)
+        record_usage(type(self).__name__, trimmed_bullets=trimmed)
+        prompt = IMPROVEMENT_PROMPT.format(resume_json=resume_json, **context)
+        
+        def emit(item: dict):
+            try:
+                improvement = Improvement(**item)
+            except ValidationError:
+                return
+            on_improvement(improvement)
         
-        response = self._call_llm(
+        response = await self._call_llm(
             prompt,
-            system_prompt="You are a professional resume coach. Provide actionable improvements. Return only valid JSON."
+            system_prompt="You are a professional resume coach. Provide actionable improvements. Return only valid JSON.",
+            item_key="improvements",
+            on_item=emit if on_improvement is not None else None
         )
         
-        data = self._parse_json(response)
+        data = await self._parse_output(response)
         return ImprovementSuggestions(**data)
@@ -1,8 +1,12 @@
 from .base import BaseAgent
+from .cache import LLMCachePolicy
 from .prompts import JD_ANALYZER_PROMPT
 from models.schemas import JDAnalysis
 
 class JDAnalyzerAgent(BaseAgent):
+    cache_policy = LLMCachePolicy()
+    output_model = JDAnalysis
+    
     @property
     def model(self) -> str:
         return self.settings.extraction_model
@@ -12,12 +16,12 @@ class JDAnalyzerAgent(BaseAgent):
         return self.settings.parsing_temp
     
     async def execute(self, jd_text: str) -> JDAnalysis:
-        prompt = JD_ANALYZER_PROMPT.format(jd_text=jd_text)
+        prompt = JD_ANALYZER_PROMPT.format(jd_text=jd_text, outline=self.output_outline)
         
-        response = self._call_llm(
+        response = await self._call_llm(
             prompt,
             system_prompt="You are a job description analyzer. Return only valid JSON."
         )
         
-        data = self._parse_json(response)
+        data = await self._parse_output(response)
         return JDAnalysis(**data)
@@ -0,0 +1,248 @@
+from pathlib import Path
+from config import get_settings
+from models.schemas import JobPosting
+from .cache import content_hash
+import json
+import numpy as np
+import threading
+import time
+
+def posting_id(job: JobPosting) -> str:
+    return content_hash(f"{job.url}\n{job.title} {job.description}")
+
+class JobIndex:
+    """Approximate nearest-neighbour index over job posting embeddings.
+
+    An IVF (inverted file) index: vectors are clustered with spherical
+    k-means and a query only scores postings in its ``nprobe`` closest
+    clusters. Until enough postings exist to train the clusters, search
+    falls back to an exact scan. Vectors are expected to be L2-normalized
+    so the inner product is the cosine similarity.
+    """
+
+    def __init__(
+        self,
+        nprobe: int = 8,
+        ttl: float | None = None,
+        max_size: int = 50000,
+        min_train_size: int = 256
+    ):
+        self.nprobe = nprobe
+        self.ttl = ttl
+        self.max_size = max_size
+        self.min_train_size = min_train_size
+        self.dim: int | None = None
+        self._lock = threading.RLock()
+        self._size = 0
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._assign = np.empty(0, dtype=np.int32)
+        self._added_at = np.empty(0, dtype=np.float64)
+        self._postings: list[JobPosting | None] = []
+        self._rows: dict[str, int] = {}
+        self._centroids: np.ndarray | None = None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, jobs: list[JobPosting], vectors: np.ndarray, now: float | np.ndarray | None = None):
+        """Insert postings; re-adding a known posting refreshes it."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        now = np.broadcast_to(time.time() if now is None else now, len(jobs))
+        # Within one batch the last copy of a posting wins
+        latest = list({posting_id(job): i for i, job in enumerate(jobs)}.values())
+        if len(latest) < len(jobs):
+            jobs, vectors, now = [jobs[i] for i in latest], vectors[latest], now[latest]
+        if not jobs:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._grow(max(64, len(jobs)))
+            self.delete([posting_id(job) for job in jobs])
+            if self._size + len(jobs) > len(self._alive):
+                self._compact_or_grow(len(jobs))
+
+            start, end = self._size, self._size + len(jobs)
+            self._vectors[start:end] = vectors
+            self._alive[start:end] = True
+            self._added_at[start:end] = now
+            self._assign[start:end] = self._nearest_centroid(vectors)
+            for row, job in enumerate(jobs, start):
+                stored = job.model_copy(update={"match_score": 0.0})
+                self._postings.append(stored)
+                self._rows[posting_id(job)] = row
+            self._size = end
+
+            excess = len(self._rows) - self.max_size
+            if excess > 0:
+                alive = np.flatnonzero(self._alive[:self._size])
+                oldest = alive[np.argsort(self._added_at[alive], kind="stable")[:excess]]
+                self._delete_rows(oldest)
+
+    def delete(self, ids: list[str]) -> int:
+        with self._lock:
+            rows = [self._rows[i] for i in ids if i in self._rows]
+            self._delete_rows(rows)
+            return len(rows)
+
+    def expire(self, now: float | None = None) -> int:
+        """Remove postings older than the TTL; returns how many were removed."""
+        if self.ttl is None:
+            return 0
+        now = time.time() if now is None else now
+        with self._lock:
+            n = self._size
+            expired = np.flatnonzero(self._alive[:n] & (self._added_at[:n] < now - self.ttl))
+            self._delete_rows(expired)
+            return len(expired)
+
+    def needs_training(self) -> bool:
+        size = len(self._rows)
+        if self._centroids is None:
+            return size >= self.min_train_size
+        return size > 2 * self._trained_size
+
+    def train(self, iterations: int = 10, seed: int = 0):
+        """Cluster the current postings; safe to run in a worker thread."""
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            data = self._vectors[rows].copy()
+        if len(data) == 0:
+            return
+
+        nlist = max(1, int(np.sqrt(len(data))))
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(len(data), nlist, replace=False)]
+        for _ in range(iterations):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        with self._lock:
+            self._centroids = centroids.astype(np.float32)
+            self._trained_size = len(data)
+            self._assign[:self._size] = self._nearest_centroid(self._vectors[:self._size])
+
+    def search(self, query: np.ndarray, k: int = 10) -> list[tuple[JobPosting, float]]:
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            n = self._size
+            if n == 0 or k <= 0:
+                return []
+            mask = self._alive[:n].copy()
+            if self._centroids is not None:
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                mask &= np.isin(self._assign[:n], probe)
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return []
+
+            scores = self._vectors[rows] @ query
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._postings[rows[i]], float(scores[i])) for i in top]
+
+    def save(self, path: str | Path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            arrays = {
+                "vectors": self._vectors[rows],
+                "added_at": self._added_at[rows]
+            }
+            if self._centroids is not None:
+                arrays["centroids"] = self._centroids
+            postings = [self._postings[row].model_dump() for row in rows]
+            meta = {"trained_size": self._trained_size}
+
+        np.savez(path / "index.npz", **arrays)
+        (path / "postings.json").write_text(json.dumps({"meta": meta, "postings": postings}))
+
+    @classmethod
+    def load(cls, path: str | Path, **kwargs) -> "JobIndex":
+        path = Path(path)
+        index = cls(**kwargs)
+        arrays = np.load(path / "index.npz")
+        data = json.loads((path / "postings.json").read_text())
+        jobs = [JobPosting(**p) for p in data["postings"]]
+        if "centroids" in arrays:
+            index._centroids = arrays["centroids"]
+            index._trained_size = data["meta"]["trained_size"]
+        if jobs:
+            index.add(jobs, arrays["vectors"], now=arrays["added_at"])
+        return index
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        if self._centroids is None or len(vectors) == 0:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _delete_rows(self, rows):
+        for row in rows:
+            job = self._postings[row]
+            if job is not None:
+                self._rows.pop(posting_id(job), None)
+                self._postings[row] = None
+            self._alive[row] = False
+
+    def _compact_or_grow(self, incoming: int):
+        # Reclaim deleted rows before allocating more space
+        live = np.flatnonzero(self._alive[:self._size])
+        n = len(live)
+        self._vectors[:n] = self._vectors[live]
+        self._assign[:n] = self._assign[live]
+        self._added_at[:n] = self._added_at[live]
+        self._alive[:n] = True
+        self._alive[n:] = False
+        self._postings = [self._postings[row] for row in live]
+        self._rows = {posting_id(job): row for row, job in enumerate(self._postings)}
+        self._size = n
+        if n + incoming > len(self._alive):
+            self._grow(max(2 * len(self._alive), n + incoming))
+
+    def _grow(self, capacity: int):
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        for name, dtype in (("_alive", bool), ("_assign", np.int32), ("_added_at", np.float64)):
+            grown = np.zeros(capacity, dtype=dtype)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+
+_job_index: JobIndex | None = None
+_job_index_lock = threading.Lock()
+
+def get_job_index() -> JobIndex | None:
+    """Shared local job corpus, loaded from job_index_path when one was saved."""
+    global _job_index
+    settings = get_settings()
+    if not settings.job_index_enabled:
+        return None
+    if _job_index is None:
+        with _job_index_lock:
+            if _job_index is None:
+                options = {
+                    "nprobe": settings.job_index_nprobe,
+                    "ttl": settings.job_index_ttl,
+                    "max_size": settings.job_index_max_size
+                }
+                path = Path(settings.job_index_path) if settings.job_index_path else None
+                if path and (path / "index.npz").exists():
+                    _job_index = JobIndex.load(path, **options)
+                else:
+                    _job_index = JobIndex(**options)
+    return _job_index
+
+def save_job_index():
+    settings = get_settings()
+    if _job_index is not None and settings.job_index_path:
+        _job_index.save(settings.job_index_path)
@@ -1,13 +1,24 @@
 from .base import BaseAgent
+from .job_index import JobIndex, get_job_index, posting_id
+from .job_sources import JOB_SOURCES, JobSource, get_http_client
+from .registry import get_embedder
+from .vector_store import get_job_embedding_store
 from models.schemas import ParsedResume, JobPosting, JobSearchResult
-from config import get_settings
+from metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_LATENCY, JOB_SOURCE_ERRORS, JOB_SOURCE_LATENCY
+import asyncio
 import httpx
 import numpy as np
+import time
+
+# Background index work in flight, and when each query last refreshed the corpus
+_background_tasks: set[asyncio.Task] = set()
+_last_refresh: dict[str, float] = {}
 
 class JobSearchAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         self._embedder = None
+        self.sources = [source_cls() for source_cls in JOB_SOURCES]
     
     @property
     def model(self) -> str:
@@ -19,26 +30,28 @@ class JobSearchAgent(BaseAgent):
     
     @property
     def embedder(self):
+        # Shared, process-wide model unless an instance-specific one was injected
         if self._embedder is None:
-            # Lazy import to avoid loading at module import time
-            from sentence_transformers import SentenceTransformer
-            self._embedder = SentenceTransformer('all-MiniLM-L6-v2')
+            return get_embedder()
         return self._embedder
     
     async def execute(self, resume: ParsedResume, limit: int = 10) -> JobSearchResult:
         skills = self._extract_skills(resume)
         query = " ".join(skills[:5])  # Top 5 skills as query
         
-        jobs = []
-        
-        # Search multiple APIs
-        jobs.extend(await self._search_adzuna(query))
-        jobs.extend(await self._search_jsearch(query))
-        jobs.extend(await self._search_remotive(query))
-        
-        # Rank by similarity
-        if jobs:
-            jobs = self._rank_jobs(jobs, resume)
+        index = get_job_index()
+        if index is not None and len(index) >= self.settings.job_index_min_size:
+            # Answer from the local corpus; the live APIs only refresh it
+            jobs = self._search_index(index, resume, limit)
+            self._schedule_refresh(index, query)
+        else:
+            jobs = await self._fetch_jobs(query)
+            
+            # Rank by similarity
+            if jobs:
+                jobs = self._rank_jobs(jobs, resume, top_k=limit)
+                if index is not None:
+                    self._spawn(self._maintain_index(index))
         
         return JobSearchResult(
             jobs=jobs[:limit],
@@ -52,114 +65,111 @@ class JobSearchAgent(BaseAgent):
         skills.extend(resume.skills.tools)
         return skills
     
-    async def _search_adzuna(self, query: str) -> list[JobPosting]:
-        settings = get_settings()
-        if not settings.adzuna_app_id or not settings.adzuna_api_key:
-            return []
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.adzuna.com/v1/api/jobs/us/search/1",
-                    params={
-                        "app_id": settings.adzuna_app_id,
-                        "app_key": settings.adzuna_api_key,
-                        "what": query,
-                        "results_per_page": 10
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return [
-                        JobPosting(
-                            title=job.get("title", ""),
-                            company=job.get("company", {}).get("display_name", ""),
-                            location=job.get("location", {}).get("display_name", ""),
-                            url=job.get("redirect_url", ""),
-                            salary=f"${job.get('salary_min', 'N/A')} - ${job.get('salary_max', 'N/A')}",
-                            description=job.get("description", "")[:500],
-                            source="Adzuna"
-                        )
-                        for job in data.get("results", [])
-                    ]
-        except Exception:
-            pass
-        return []
+    def _resume_text(self, resume: ParsedResume) -> str:
+        return f"{' '.join(self._extract_skills(resume))} {resume.summary}"
     
-    async def _search_jsearch(self, query: str) -> list[JobPosting]:
-        settings = get_settings()
-        if not settings.jsearch_api_key:
+    async def _fetch_jobs(self, query: str) -> list[JobPosting]:
+        # Query every registered job board concurrently
+        results = await asyncio.gather(
+            *[self._search_source(source, query) for source in self.sources]
+        )
+        return [job for source_jobs in results for job in source_jobs]
+    
+    async def _search_source(self, source: JobSource, query: str) -> list[JobPosting]:
+        if not source.is_configured(self.settings):
             return []
-        
+        start = time.perf_counter()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://jsearch.p.rapidapi.com/search",
-                    params={"query": query, "num_pages": 1},
-                    headers={
-                        "X-RapidAPI-Key": settings.jsearch_api_key,
-                        "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return [
-                        JobPosting(
-                            title=job.get("job_title", ""),
-                            company=job.get("employer_name", ""),
-                            location=f"{job.get('job_city', '')}, {job.get('job_state', '')}",
-                            url=job.get("job_apply_link", ""),
-                            salary=job.get("job_salary", ""),
-                            description=job.get("job_description", "")[:500],
-                            source="JSearch"
-                        )
-                        for job in data.get("data", [])
-                    ]
-        except Exception:
-            pass
-        return []
+            return await source.search(get_http_client(), query, self.settings)
+        except Exception as e:
+            # Non-2xx replies are labelled with their status code, anything else with the exception type
+            reason = str(e.response.status_code) if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            JOB_SOURCE_ERRORS.inc(source.name, reason)
+            return []
+        finally:
+            JOB_SOURCE_LATENCY.observe(source.name, value=time.perf_counter() - start)
     
-    async def _search_remotive(self, query: str) -> list[JobPosting]:
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://remotive.com/api/remote-jobs",
-                    params={"search": query, "limit": 10},
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return [
-                        JobPosting(
-                            title=job.get("title", ""),
-                            company=job.get("company_name", ""),
-                            location="Remote",
-                            url=job.get("url", ""),
-                            salary=job.get("salary", ""),
-                            description=job.get("description", "")[:500],
-                            source="Remotive"
-                        )
-                        for job in data.get("jobs", [])[:10]
-                    ]
-        except Exception:
-            pass
-        return []
+    def _search_index(self, index: JobIndex, resume: ParsedResume, limit: int) -> list[JobPosting]:
+        resume_embedding, _ = self._embed([], self._resume_text(resume))
+        return [
+            job.model_copy(update={"match_score": score * 100})
+            for job, score in index.search(resume_embedding, limit)
+        ]
+    
+    def _schedule_refresh(self, index: JobIndex, query: str):
+        now = time.monotonic()
+        if now - _last_refresh.get(query, float("-inf")) < self.settings.job_index_refresh_interval:
+            return
+        _last_refresh[query] = now
+        self._spawn(self._refresh_index(index, query))
     
-    def _rank_jobs(self, jobs: list[JobPosting], resume: ParsedResume) -> list[JobPosting]:
-        resume_text = f"{' '.join(self._extract_skills(resume))} {resume.summary}"
-        resume_embedding = self.embedder.encode([resume_text])[0]
+    async def _refresh_index(self, index: JobIndex, query: str):
+        jobs = await self._fetch_jobs(query)
+        if jobs:
+            _, job_embeddings = await asyncio.to_thread(self._embed, jobs)
+            index.add(jobs, job_embeddings)
+        await self._maintain_index(index)
+    
+    async def _maintain_index(self, index: JobIndex):
+        index.expire()
+        if index.needs_training():
+            await asyncio.to_thread(index.train)
+    
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    
+    def _embed(self, jobs: list[JobPosting], resume_text: str | None = None) -> tuple[np.ndarray | None, np.ndarray]:
+        """Embed postings (and optionally the resume) in one batched forward pass."""
+        job_texts = [f"{job.title} {job.description}" for job in jobs]
+        
+        # Postings seen in earlier searches are served from the shared store
+        store = get_job_embedding_store()
+        keys = [posting_id(job) for job in jobs]
+        cached = store.get_many(keys) if store is not None else {}
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        
+        texts = ([resume_text] if resume_text is not None else []) + [job_texts[i] for i in missing]
+        start = time.perf_counter()
+        embeddings = np.asarray(
+            self.embedder.encode(texts, normalize_embeddings=True) if texts else [],
+            dtype=np.float32
+        )
+        if texts:
+            EMBEDDING_BATCH_SIZE.observe("job_search", value=len(texts))
+            EMBEDDING_LATENCY.observe("job_search", value=time.perf_counter() - start)
+        resume_embedding = embeddings[0] if resume_text is not None else None
+        new_embeddings = embeddings[1:] if resume_text is not None else embeddings
+        if store is not None and missing:
+            store.put_many([keys[i] for i in missing], new_embeddings)
+        
+        dim = embeddings.shape[1] if len(embeddings) else len(next(iter(cached.values())))
+        job_embeddings = np.empty((len(jobs), dim), dtype=np.float32)
+        if missing:
+            job_embeddings[missing] = new_embeddings
+        for i, key in enumerate(keys):
+            if key in cached:
+                job_embeddings[i] = cached[key]
+        return resume_embedding, job_embeddings
+    
+    def _rank_jobs(self, jobs: list[JobPosting], resume: ParsedResume, top_k: int | None = None) -> list[JobPosting]:
+        resume_embedding, job_embeddings = self._embed(jobs, self._resume_text(resume))
         
-        for job in jobs:
-            job_text = f"{job.title} {job.description}"
-            job_embedding = self.embedder.encode([job_text])[0]
-            similarity = np.dot(resume_embedding, job_embedding) / (
-                np.linalg.norm(resume_embedding) * np.linalg.norm(job_embedding)
-            )
-            job.match_score = float(similarity * 100)
+        # Feed the local corpus with everything the live APIs returned
+        index = get_job_index()
+        if index is not None:
+            index.add(jobs, job_embeddings)
         
-        return sorted(jobs, key=lambda x: x.match_score, reverse=True)
+        # Normalized vectors make the dot product the cosine
+        scores = job_embeddings @ resume_embedding
+        
+        for job, score in zip(jobs, scores):
+            job.match_score = float(score * 100)
+        
+        k = len(jobs) if top_k is None else min(top_k, len(jobs))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(jobs) else np.arange(len(jobs))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [jobs[i] for i in top]
@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from config import Settings, get_settings
+from models.schemas import JobPosting
+import httpx
+import importlib.util
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """Send every request to ``base_url``, keeping its path and query.
+
+    The original host travels in ``X-Forwarded-Host`` so a stand-in server
+    can tell the job boards apart.
+    """
+
+    def __init__(self, base_url: str, transport: httpx.AsyncBaseTransport):
+        self.target = httpx.URL(base_url)
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.headers["X-Forwarded-Host"] = request.url.host
+        request.headers["Host"] = self.target.netloc.decode()
+        request.url = request.url.copy_with(scheme=self.target.scheme, host=self.target.host, port=self.target.port)
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+# One long-lived pool shared by every job board; HTTP/2 needs the optional h2 package
+_http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        settings = get_settings()
+        transport = httpx.AsyncHTTPTransport(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=settings.job_search_max_connections,
+                max_keepalive_connections=settings.job_search_max_connections
+            )
+        )
+        if settings.job_board_base_url:
+            transport = RedirectTransport(settings.job_board_base_url, transport)
+        _http_client = httpx.AsyncClient(transport=transport, timeout=settings.job_search_timeout)
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+class JobSource(ABC):
+    """A job board queried by JobSearchAgent. Register subclasses with @register_source."""
+    name: str = ""
+
+    def is_configured(self, settings: Settings) -> bool:
+        return True
+
+    @abstractmethod
+    async def search(self, client: httpx.AsyncClient, query: str, settings: Settings) -> list[JobPosting]:
+        pass
+
+JOB_SOURCES: list[type[JobSource]] = []
+
+def register_source(cls: type[JobSource]) -> type[JobSource]:
+    JOB_SOURCES.append(cls)
+    return cls
+
+@register_source
+class AdzunaSource(JobSource):
+    name = "Adzuna"
+
+    def is_configured(self, settings: Settings) -> bool:
+        return bool(settings.adzuna_app_id and settings.adzuna_api_key)
+
+    async def search(self, client: httpx.AsyncClient, query: str, settings: Settings) -> list[JobPosting]:
+        response = await client.get(
+            "https://api.adzuna.com/v1/api/jobs/us/search/1",
+            params={
+                "app_id": settings.adzuna_app_id,
+                "app_key": settings.adzuna_api_key,
+                "what": query,
+                "results_per_page": 10
+            }
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return [
+            JobPosting(
+                title=job.get("title", ""),
+                company=job.get("company", {}).get("display_name", ""),
+                location=job.get("location", {}).get("display_name", ""),
+                url=job.get("redirect_url", ""),
+                salary=f"${job.get('salary_min', 'N/A')} - ${job.get('salary_max', 'N/A')}",
+                description=job.get("description", "")[:500],
+                source=self.name
+            )
+            for job in data.get("results", [])
+        ]
+
+@register_source
+class JSearchSource(JobSource):
+    name = "JSearch"
+
+    def is_configured(self, settings: Settings) -> bool:
+        return bool(settings.jsearch_api_key)
+
+    async def search(self, client: httpx.AsyncClient, query: str, settings: Settings) -> list[JobPosting]:
+        response = await client.get(
+            "https://jsearch.p.rapidapi.com/search",
+            params={"query": query, "num_pages": 1},
+            headers={
+                "X-RapidAPI-Key": settings.jsearch_api_key,
+                "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
+            }
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return [
+            JobPosting(
+                title=job.get("job_title", ""),
+                company=job.get("employer_name", ""),
+                location=f"{job.get('job_city', '')}, {job.get('job_state', '')}",
+                url=job.get("job_apply_link", ""),
+                salary=job.get("job_salary", ""),
+                description=job.get("job_description", "")[:500],
+                source=self.name
+            )
+            for job in data.get("data", [])
+        ]
+
+@register_source
+class RemotiveSource(JobSource):
+    name = "Remotive"
+
+    async def search(self, client: httpx.AsyncClient, query: str, settings: Settings) -> list[JobPosting]:
+        response = await client.get(
+            "https://remotive.com/api/remote-jobs",
+            params={"search": query, "limit": 10}
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return [
+            JobPosting(
+                title=job.get("title", ""),
+                company=job.get("company_name", ""),
+                location="Remote",
+                url=job.get("url", ""),
+                salary=job.get("salary", ""),
+                description=job.get("description", "")[:500],
+                source=self.name
+            )
+            for job in data.get("jobs", [])[:10]
+        ]
@@ -0,0 +1,165 @@
+import json
+import re
+
+class JSONStreamParser:
+    """Incrementally scan a streamed LLM reply for one top-level JSON object.
+
+    Text before the opening brace (prose, a ```json fence) is skipped.
+    Objects inside the top-level array named ``item_key`` are decoded and
+    returned from ``feed`` as soon as their closing brace arrives, and
+    ``done`` turns true once the top-level object closes, so the caller can
+    stop generation there.
+    """
+
+    def __init__(self, item_key: str | None = None):
+        self.item_key = item_key
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._start: int | None = None
+        # One entry per open container: [kind, key in parent, pending key, item start]
+        self._stack: list[list] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: str | None = None
+
+    @property
+    def text(self) -> str:
+        """The top-level object as received so far."""
+        return self._text[self._start:self._pos] if self._start is not None else ""
+
+    def feed(self, chunk: str) -> list[dict]:
+        items = []
+        if self.done or not chunk:
+            return items
+        self._text += chunk
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            self._pos = i + 1
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:i + 1]
+                continue
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._stack.append(["object", None, None, None])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and self._stack and self._stack[-1][0] == "object":
+                self._stack[-1][2] = json.loads(self._last_string) if self._last_string else None
+            elif ch == ",":
+                if self._stack and self._stack[-1][0] == "object":
+                    self._stack[-1][2] = None
+            elif ch in "{[":
+                parent = self._stack[-1]
+                key = parent[2] if parent[0] == "object" else parent[1]
+                if ch == "{" and self._is_item_array(parent):
+                    parent[3] = i
+                self._stack.append(["object" if ch == "{" else "array", key, None, None])
+            elif ch in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    break
+                parent = self._stack[-1]
+                if ch == "}" and self._is_item_array(parent) and parent[3] is not None:
+                    try:
+                        items.append(json.loads(text[parent[3]:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    parent[3] = None
+        return items
+
+    def _is_item_array(self, container: list) -> bool:
+        # Only arrays directly under the top-level object hold items
+        return (
+            self.item_key is not None
+            and container[0] == "array"
+            and container[1] == self.item_key
+            and len(self._stack) == 2
+        )
+
+_FENCE_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*```')
+
+def repair_json(text: str) -> tuple[dict, bool]:
+    """Parse the first JSON object in an LLM reply, repairing common damage.
+
+    Trailing commas are dropped, and a reply cut off mid-way is closed
+    after its last complete value. Returns the object and whether a repair
+    was needed; raises ``ValueError`` when nothing usable is found.
+    """
+    text = text.strip()
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value, False
+    except json.JSONDecodeError:
+        pass
+
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("Could not parse JSON from response")
+    out: list[str] = []
+    closers: list[str] = []
+    # Places the text can be cut and still hold only complete values
+    cuts: list[tuple[int, list[str]]] = []
+    in_string = escape = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            out.append(ch)
+            # Inner containers cut off right after opening are dropped, not left empty
+            if len(closers) == 1:
+                cuts.append((len(out), list(closers)))
+            continue
+        elif ch in "}]":
+            while out and (out[-1].isspace() or out[-1] == ","):
+                out.pop()
+            if closers:
+                closers.pop()
+            out.append(ch)
+            if not closers:
+                break
+            cuts.append((len(out), list(closers)))
+            continue
+        elif ch == ",":
+            cuts.append((len(out), list(closers)))
+        out.append(ch)
+
+    attempts = [("".join(out) + ('"' if in_string else ""), closers)]
+    attempts += [("".join(out[:n]), stack) for n, stack in reversed(cuts[-20:])]
+    for body, stack in attempts:
+        body = body.rstrip().rstrip(",")
+        try:
+            value = json.loads(body + "".join(reversed(stack)))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value, True
+    raise ValueError("Could not parse JSON from response")
@@ -1,9 +1,17 @@
-from .base import BaseAgent
+from .base import BaseAgent, record_usage
+from .cache import LLMCachePolicy
+from .compact import compact_json, compact_jd, compact_resume, estimate_tokens
 from .prompts import MATCHING_PROMPT
+from .scoring import score_match
+from dataclasses import asdict
 from models.schemas import ParsedResume, JDAnalysis, MatchResult
-import json
 
 class MatchingAgent(BaseAgent):
+    cache_policy = LLMCachePolicy()
+    output_model = MatchResult
+    # Scores are computed locally; the LLM only writes these
+    output_fields = {"experience_match", "strengths", "gaps"}
+    
     @property
     def model(self) -> str:
         return self.settings.reasoning_model
@@ -13,15 +21,23 @@ class MatchingAgent(BaseAgent):
         return self.settings.matching_temp
     
     async def execute(self, resume: ParsedResume, jd: JDAnalysis) -> MatchResult:
-        prompt = MATCHING_PROMPT.format(
-            resume_json=json.dumps(resume.model_dump(), indent=2),
-            jd_json=json.dumps(jd.model_dump(), indent=2)
-        )
+        # Numbers come from the local scorer; the LLM only writes the qualitative fields
+        scores = asdict(score_match(resume, jd))
+        context = {"outline": self.output_outline, "jd_json": compact_jd(jd), "scores_json": compact_json(scores)}
+        reserved = estimate_tokens(MATCHING_PROMPT.format(resume_json="", **context))
+        resume_json, trimmed = compact_resume(resume, jd, self.settings.matching_input_tokens, reserved)
+        record_usage(type(self).__name__, trimmed_bullets=trimmed)
+        prompt = MATCHING_PROMPT.format(resume_json=resume_json, **context)
         
-        response = self._call_llm(
+        response = await self._call_llm(
             prompt,
             system_prompt="You are an ATS scoring expert. Be precise and return only valid JSON."
         )
         
-        data = self._parse_json(response)
-        return MatchResult(**data)
+        data = await self._parse_output(response)
+        return MatchResult(
+            **scores,
+            experience_match=data.get("experience_match", ""),
+            strengths=data.get("strengths", []),
+            gaps=data.get("gaps", [])
+        )
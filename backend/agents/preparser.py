@@ -0,0 +1,275 @@
+from dataclasses import dataclass, field
+import re
+
+# Bump whenever the rules below change; parsed-resume cache keys include it
+PREPARSER_VERSION = "2"
+
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about me", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "core competencies", "technologies", "skills and tools"],
+    "projects": ["projects", "personal projects", "academic projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "certifications and licenses"],
+}
+_HEADINGS = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+_HEADING_RE = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{2,40}?)\s*:?\s*$")
+# Lower-case words a capitalised heading may still contain
+_HEADING_SMALL_WORDS = {"and", "or", "of", "in", "for", "the", "&", "/"}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w/])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}(?!\w)")
+LOCATION_RE = re.compile(r"\b[A-Z][a-zA-Z .]+,\s*(?:[A-Z]{2}|[A-Z][a-z]+)\b")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w-]+/?", re.IGNORECASE)
+
+_DATE = r"(?:(?:[A-Z][a-z]{2,8}\.?\s+)?\d{4}|\d{1,2}/\d{4})"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|Present|Current|Now)\s*$", re.IGNORECASE
+)
+YEAR_RE = re.compile(rf"(?P<end>{_DATE})\s*$")
+BULLET_RE = re.compile(r"^\s*[•\-*▪●◦‣]\s*(?P<text>.+)$")
+DEGREE_RE = re.compile(
+    r"\b(?:B\.?S\.?c?|B\.?A\.?|M\.?S\.?c?|M\.?A\.?|Ph\.?D\.?|MBA|B\.?Tech|M\.?Tech|B\.?E\.?|M\.?E\.?|"
+    r"Bachelor(?:'s)?|Master(?:'s)?|Doctor(?:ate)?|Associate(?:'s)?)\b"
+)
+INSTITUTION_RE = re.compile(r"\b(?:University|College|Institute|School|Academy|Polytechnic)\b", re.IGNORECASE)
+GPA_RE = re.compile(r"\bGPA\s*:?\s*(?P<gpa>\d(?:\.\d+)?(?:\s*/\s*\d(?:\.\d+)?)?)", re.IGNORECASE)
+# Tried in order; the first one that splits a line wins
+_SEPARATORS = [re.compile(p) for p in (r"\s*\|\s*", r"\s+[-–—]\s+", r"\s+at\s+", r",\s+")]
+
+SKILL_LABELS = {
+    "languages": ["languages", "programming languages", "programming"],
+    "frameworks": ["frameworks", "libraries", "frameworks and libraries", "frameworks & libraries"],
+    "tools": ["tools", "technologies", "platforms", "cloud", "databases", "devops", "tools and platforms", "developer tools"],
+    "soft_skills": ["soft skills", "interpersonal skills"],
+}
+_SKILL_LABELS = {alias: category for category, aliases in SKILL_LABELS.items() for alias in aliases}
+KNOWN_SKILLS = {
+    "languages": {
+        "python", "java", "javascript", "typescript", "c", "c++", "c#", "go", "golang", "rust", "ruby", "php",
+        "kotlin", "swift", "scala", "r", "sql", "bash", "html", "css", "matlab", "perl", "dart",
+    },
+    "frameworks": {
+        "react", "angular", "vue", "next.js", "node.js", "express", "django", "flask", "fastapi", "spring",
+        "spring boot", "rails", ".net", "tensorflow", "pytorch", "keras", "scikit-learn", "pandas", "numpy",
+        "langchain", "langgraph", "tailwind", "svelte", "laravel",
+    },
+    "soft_skills": {
+        "leadership", "communication", "teamwork", "problem solving", "collaboration", "mentoring",
+        "time management", "critical thinking", "adaptability",
+    },
+}
+
+@dataclass
+class PreParse:
+    """Deterministic findings for a resume and what is still left for the LLM."""
+    fields: dict = field(default_factory=dict)
+    header: str = ""
+    sections: dict[str, str] = field(default_factory=dict)
+    unresolved: list[str] = field(default_factory=list)
+
+    @property
+    def needs_llm(self) -> bool:
+        return bool(self.unresolved)
+
+    def llm_text(self) -> str:
+        """The part of the resume that still needs reasoning."""
+        parts = [
+            self.header if section == "header" else f"{section.upper()}\n{self.sections[section]}"
+            for section in self.unresolved
+        ]
+        return "\n\n".join(part for part in parts if part.strip())
+
+def preparse_resume(text: str) -> PreParse:
+    header, sections = segment_sections(text)
+    result = PreParse(header=header, sections=sections)
+    fields = result.fields
+
+    for key, pattern in (("email", EMAIL_RE), ("linkedin", LINKEDIN_RE), ("phone", PHONE_RE)):
+        match = pattern.search(header) or pattern.search(text)
+        if match:
+            fields[key] = match.group(0).strip()
+    location = LOCATION_RE.search(header)
+    if location:
+        fields["location"] = location.group(0).strip()
+    name = _guess_name(header)
+    if name:
+        fields["name"] = name
+    # No headings, or a long header, means the layout was not recognised; let the LLM read it
+    if not name or not sections or len([line for line in header.splitlines() if line.strip()]) > 8:
+        result.unresolved.append("header")
+
+    if "summary" in sections:
+        fields["summary"] = " ".join(line.strip() for line in sections["summary"].splitlines() if line.strip())
+    if "skills" in sections:
+        fields["skills"] = parse_skills(sections["skills"])
+    if "certifications" in sections:
+        fields["certifications"] = [_strip_bullet(line) for line in sections["certifications"].splitlines() if line.strip()]
+
+    for section, parser in (("experience", parse_experience), ("education", parse_education)):
+        if section in sections:
+            entries = parser(sections[section])
+            if entries is None:
+                result.unresolved.append(section)
+            else:
+                fields[section] = entries
+    # Projects and unrecognised sections such as Awards are left to the LLM
+    for section in ("projects", "other"):
+        if section in sections:
+            result.unresolved.append(section)
+    return result
+
+def segment_sections(text: str) -> tuple[str, dict[str, str]]:
+    """Split resume text on headings; text before the first recognised heading is the header.
+
+    Heading-like lines that are not in SECTION_ALIASES start an "other"
+    section, heading included, so they never run into the section above.
+    """
+    header: list[str] = []
+    sections: dict[str, list[str]] = {}
+    current = header
+    previous = ""
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        section = _HEADINGS.get(match.group(1).strip().lower()) if match else None
+        if section:
+            current = sections.setdefault(section, [])
+        elif match and current is not header and _is_unknown_heading(match.group(1).strip(), line, previous):
+            current = sections.setdefault("other", [])
+            current.append(line)
+        else:
+            current.append(line)
+        previous = line
+    return "\n".join(header).strip(), {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+def _is_unknown_heading(title: str, line: str, previous: str) -> bool:
+    # One skill per line looks much like a title-case heading, so those also
+    # need a blank line or a colon; all-caps headings stand out on their own
+    words = title.split()
+    if len(words) > 4 or any(title.lower() in known for known in KNOWN_SKILLS.values()):
+        return False
+    if title.isupper() and len(title.replace(" ", "")) >= 4:
+        return True
+    capitalised = all(word[0].isupper() or word.lower() in _HEADING_SMALL_WORDS for word in words)
+    return capitalised and (not previous.strip() or line.rstrip().endswith(":"))
+
+def parse_skills(text: str) -> dict[str, list[str]]:
+    skills: dict[str, list[str]] = {category: [] for category in ("languages", "frameworks", "tools", "soft_skills")}
+    for line in text.splitlines():
+        line = _strip_bullet(line)
+        if not line:
+            continue
+        label, _, rest = line.partition(":")
+        category = _SKILL_LABELS.get(label.strip().lower()) if rest else None
+        for item in re.split(r"\s*[,;|•]\s*", rest if category else line):
+            item = item.strip().rstrip(".")
+            if item:
+                target = category or _classify_skill(item)
+                if item not in skills[target]:
+                    skills[target].append(item)
+    return skills
+
+def parse_experience(text: str) -> list[dict] | None:
+    """Parse 'Title | Company | Dates' entries with bullets, or None if the layout is not recognised."""
+    entries: list[dict] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        bullet = BULLET_RE.match(line)
+        if bullet and entries:
+            entries[-1]["bullets"].append(bullet.group("text").strip())
+            continue
+        dates = DATE_RANGE_RE.search(line)
+        if entries and entries[-1]["bullets"] and not dates:
+            # A bullet wrapped onto the next line; entry headers always carry dates
+            entries[-1]["bullets"][-1] += " " + line.strip()
+            continue
+        parts = _split_parts(line[:dates.start()]) if dates else []
+        if len(parts) < 2:
+            return None
+        entries.append({
+            "title": parts[0],
+            "company": parts[1],
+            "location": parts[2] if len(parts) > 2 else None,
+            "start_date": dates.group("start"),
+            "end_date": dates.group("end"),
+            "bullets": [],
+        })
+    return entries or None
+
+def parse_education(text: str) -> list[dict] | None:
+    """Parse one-line 'Degree in Field | Institution | Dates' entries, or None if not recognised."""
+    entries: list[dict] = []
+    pending_institution = None
+    for line in text.splitlines():
+        line = _strip_bullet(line)
+        if not line:
+            continue
+        gpa = GPA_RE.search(line)
+        if gpa and entries and not DEGREE_RE.search(line):
+            entries[-1]["gpa"] = gpa.group("gpa")
+            continue
+        if not DEGREE_RE.search(line):
+            if INSTITUTION_RE.search(line) and pending_institution is None:
+                pending_institution = line
+                continue
+            return None
+
+        body = GPA_RE.sub("", line).strip(" ,|")
+        dates = DATE_RANGE_RE.search(body) or YEAR_RE.search(body)
+        if dates:
+            body = body[:dates.start()].strip(" ,|-–—")
+        parts = _split_parts(body)
+        degree_part = next((p for p in parts if DEGREE_RE.search(p)), body)
+        institution = pending_institution or next((p for p in parts if p != degree_part), "")
+        if not institution:
+            return None
+        degree, field_of_study = _split_degree(degree_part)
+        entries.append({
+            "institution": institution,
+            "degree": degree,
+            "field": field_of_study,
+            "start_date": dates.groupdict().get("start") if dates else None,
+            "end_date": dates.group("end") if dates else None,
+            "gpa": gpa.group("gpa") if gpa else None,
+        })
+        pending_institution = None
+    if pending_institution is not None:
+        return None
+    return entries or None
+
+def _split_degree(text: str) -> tuple[str, str]:
+    match = re.match(r"^(?P<degree>.+?)\s+(?:in|of)\s+(?P<field>.+)$", text)
+    if match and DEGREE_RE.search(match.group("degree")):
+        return match.group("degree").strip(), match.group("field").strip()
+    return text.strip(), ""
+
+def _split_parts(text: str) -> list[str]:
+    text = text.strip(" ,|-–—")
+    for separator in _SEPARATORS:
+        parts = [part.strip(" ,") for part in separator.split(text) if part.strip(" ,")]
+        if len(parts) > 1:
+            return parts
+    return [text] if text else []
+
+def _strip_bullet(line: str) -> str:
+    bullet = BULLET_RE.match(line)
+    return (bullet.group("text") if bullet else line).strip()
+
+def _classify_skill(item: str) -> str:
+    lowered = item.lower()
+    for category, known in KNOWN_SKILLS.items():
+        if lowered in known:
+            return category
+    return "tools"
+
+def _guess_name(header: str) -> str:
+    for line in header.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Z][a-zA-Z'.-]*", w) for w in words):
+            return line
+        return ""
+    return ""
@@ -0,0 +1,76 @@
+from typing import Callable
+import sys
+import threading
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Process-wide registry of agents and heavy models shared by routes and graphs
+_lock = threading.Lock()
+_agents: dict = {}
+_models: dict[str, object] = {}
+_model_locks: dict[str, threading.Lock] = {}
+
+def _agent_classes() -> dict:
+    from . import (
+        ResumeParserAgent,
+        JDAnalyzerAgent,
+        MatchingAgent,
+        ImprovementAgent,
+        JobSearchAgent,
+        UIFormatterAgent
+    )
+    return {
+        'resume_parser': ResumeParserAgent,
+        'jd_analyzer': JDAnalyzerAgent,
+        'matcher': MatchingAgent,
+        'improver': ImprovementAgent,
+        'job_searcher': JobSearchAgent,
+        'ui_formatter': UIFormatterAgent,
+    }
+
+def get_agent(name: str):
+    agent = _agents.get(name)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(name)
+            if agent is None:
+                agent = _agent_classes()[name]()
+                _agents[name] = agent
+    return agent
+
+def get_agents() -> dict:
+    return {name: get_agent(name) for name in _agent_classes()}
+
+def get_model(name: str, loader: Callable[[], object]) -> object:
+    """Load a model once per process; concurrent callers wait for the first load."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        model_lock = _model_locks.setdefault(name, threading.Lock())
+    with model_lock:
+        model = _models.get(name)
+        if model is None:
+            model = loader()
+            _models[name] = model
+    return model
+
+def get_embedder():
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(EMBEDDING_MODEL)
+    return get_model('embedder', load)
+
+def _model_bytes(model: object) -> int:
+    # torch modules report parameter and buffer storage; anything else falls back to its shallow size
+    if hasattr(model, "parameters") and hasattr(model, "buffers"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    nbytes = getattr(model, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(model)
+
+def model_memory() -> dict[str, int]:
+    """Approximate resident bytes of each loaded model."""
+    return {name: _model_bytes(model) for name, model in list(_models.items())}
@@ -1,12 +1,32 @@
 from .base import BaseAgent
+from .cache import LRUCache, content_hash
+from .compact import schema_outline
+from .extraction import extract_docx, extract_pdf, extract_text, get_extraction_pool
+from .preparser import PREPARSER_VERSION, preparse_resume
 from .prompts import RESUME_PARSER_PROMPT
 from models.schemas import ParsedResume
-import pdfplumber
-import fitz  # pymupdf
-from docx import Document
-from io import BytesIO
+from config import get_settings
+
+SYSTEM_PROMPT = "You are a precise resume parser. Return only valid JSON."
+
+# Bump when text extraction changes; the prompt version is derived automatically
+EXTRACTOR_VERSION = "2"
+PROMPT_VERSION = content_hash(SYSTEM_PROMPT + RESUME_PARSER_PROMPT + schema_outline(ParsedResume))[:12]
+
+_caches: dict[str, LRUCache] = {}
+
+def get_resume_caches() -> dict[str, LRUCache]:
+    """Two-level cache: extracted text and the final ParsedResume."""
+    if not _caches:
+        settings = get_settings()
+        disk_dir = settings.resume_cache_dir or None
+        for level in ("resume_text", "parsed_resume"):
+            _caches[level] = LRUCache(settings.resume_cache_max_bytes, disk_dir, namespace=level)
+    return _caches
 
 class ResumeParserAgent(BaseAgent):
+    output_model = ParsedResume
+    
     @property
     def model(self) -> str:
         return self.settings.extraction_model
@@ -16,63 +36,65 @@ class ResumeParserAgent(BaseAgent):
         return self.settings.parsing_temp
     
     async def execute(self, file_content: bytes, filename: str) -> ParsedResume:
-        text = self._extract_text(file_content, filename)
-        prompt = RESUME_PARSER_PROMPT.format(resume_text=text)
+        caches = get_resume_caches()
+        digest = content_hash(file_content)
+        parsed_key = f"{digest}:{self._extraction_key()}:{self.model}:{PROMPT_VERSION}:{PREPARSER_VERSION}:{self.settings.resume_preparse_enabled}"
         
-        response = self._call_llm(
-            prompt,
-            system_prompt="You are a precise resume parser. Return only valid JSON."
-        )
+        cached = caches["parsed_resume"].get(parsed_key)
+        if cached is not None:
+            return ParsedResume.model_validate_json(cached)
         
-        data = self._parse_json(response)
-        return ParsedResume(**data)
+        text = await self._get_text(file_content, filename, digest)
+        
+        if self.settings.resume_preparse_enabled:
+            # Contact details, sections and simple entries are found by rules;
+            # the LLM only sees the sections that still need reasoning
+            pre = preparse_resume(text)
+            data = await self._parse_with_llm(pre.llm_text()) if pre.needs_llm else {}
+            data.update(pre.fields)
+        else:
+            data = await self._parse_with_llm(text)
+        
+        parsed = ParsedResume(**data)
+        caches["parsed_resume"].set(parsed_key, parsed.model_dump_json())
+        return parsed
     
-    def _extract_text(self, content: bytes, filename: str) -> str:
+    async def _parse_with_llm(self, text: str) -> dict:
+        prompt = RESUME_PARSER_PROMPT.format(resume_text=text, outline=self.output_outline)
+        response = await self._call_llm(prompt, system_prompt=SYSTEM_PROMPT)
+        return await self._parse_output(response)
+    
+    async def _get_text(self, content: bytes, filename: str, digest: str) -> str:
         ext = filename.lower().split('.')[-1]
+        text_key = f"{digest}:{ext}:{self._extraction_key()}"
+        text_cache = get_resume_caches()["resume_text"]
         
-        if ext == 'pdf':
-            return self._extract_pdf(content)
-        elif ext in ['docx', 'doc']:
-            return self._extract_docx(content)
-        elif ext == 'txt':
-            return content.decode('utf-8', errors='ignore')
-        else:
-            raise ValueError(f"Unsupported file type: {ext}")
+        text = text_cache.get(text_key)
+        if text is None:
+            if ext in ['pdf', 'docx', 'doc']:
+                # PDF/DOCX parsing is CPU-bound; keep it off the event loop
+                text = await get_extraction_pool().run(
+                    extract_text,
+                    content,
+                    ext,
+                    self.settings.extraction_max_pages,
+                    self.settings.extraction_max_chars
+                )
+            else:
+                text = self._extract_text(content, filename)
+            text_cache.set(text_key, text)
+        return text
+    
+    def _extraction_key(self) -> str:
+        # Extracted text depends on the page and character limits as well as the extractor
+        return f"{EXTRACTOR_VERSION}:{self.settings.extraction_max_pages}:{self.settings.extraction_max_chars}"
+    
+    def _extract_text(self, content: bytes, filename: str) -> str:
+        ext = filename.lower().split('.')[-1]
+        return extract_text(content, ext, self.settings.extraction_max_pages, self.settings.extraction_max_chars)
     
     def _extract_pdf(self, content: bytes) -> str:
-        text_parts = []
-        
-        # Try pdfplumber first (better for text-based PDFs)
-        try:
-            with pdfplumber.open(BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-        except Exception:
-            pass
-        
-        # Fallback to pymupdf if pdfplumber fails
-        if not text_parts:
-            try:
-                doc = fitz.open(stream=content, filetype="pdf")
-                for page in doc:
-                    text_parts.append(page.get_text())
-                doc.close()
-            except Exception as e:
-                raise ValueError(f"Could not extract text from PDF: {e}")
-        
-        return "\n".join(text_parts)
+        return extract_pdf(content, self.settings.extraction_max_pages, self.settings.extraction_max_chars)
     
     def _extract_docx(self, content: bytes) -> str:
-        doc = Document(BytesIO(content))
-        paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-        
-        # Also extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        paragraphs.append(cell.text)
-        
-        return "\n".join(paragraphs)
+        return extract_docx(content, self.settings.extraction_max_chars)
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from models.schemas import ParsedResume, JDAnalysis
+import numpy as np
+import re
+
+# Same weights the matching prompt used to ask the LLM to apply
+WEIGHTS = np.array([0.40, 0.25, 0.20, 0.15])  # skills, experience, keywords, education
+
+ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "py": "python",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "ci/cd": "ci cd",
+    "sklearn": "scikit-learn",
+    "tf": "tensorflow",
+    "dotnet": ".net",
+}
+_TOKEN_RE = re.compile(r"\.?[a-z0-9][a-z0-9+#.]*")
+_MAX_NGRAM = 4
+_YEARS_RE = re.compile(r"(\d+)")
+_DATE_YEAR_RE = re.compile(r"(\d{4})")
+
+@dataclass(frozen=True)
+class ScoreCard:
+    ats_score: int
+    skill_overlap_percent: float
+    keyword_coverage: float
+    matched_skills: list[str]
+    missing_skills: list[str]
+
+def stem(token: str) -> str:
+    """Light suffix stripping so 'pipelines', 'deploying' and 'deployed' match their base form."""
+    if len(token) <= 4 or not token.isalpha():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+def normalize(term: str) -> tuple[str, ...]:
+    """Canonical stemmed token tuple for a skill, keyword or phrase."""
+    text = term.lower().strip()
+    text = ALIASES.get(text, text)
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        token = token.rstrip(".")
+        token = ALIASES.get(token, token)
+        tokens.extend(stem(t) for t in token.split())
+    return tuple(tokens)
+
+def term_ngrams(text: str) -> set[tuple[str, ...]]:
+    tokens = normalize(text)
+    return {
+        tokens[i:i + n]
+        for n in range(1, _MAX_NGRAM + 1)
+        for i in range(len(tokens) - n + 1)
+    }
+
+def resume_terms(resume: ParsedResume) -> tuple[set[tuple[str, ...]], set[tuple[str, ...]]]:
+    """Normalized n-grams for the whole resume and for the experience section alone."""
+    skills = resume.skills
+    listed = skills.languages + skills.frameworks + skills.tools + skills.soft_skills
+    listed += [tech for project in resume.projects for tech in project.technologies]
+    experience_text = " \n ".join(
+        " ".join([job.title] + job.bullets) for job in resume.experience
+    )
+    other_text = " \n ".join(
+        [resume.summary]
+        + [f"{p.name} {p.description}" for p in resume.projects]
+        + [f"{e.degree} {e.field}" for e in resume.education]
+        + resume.certifications
+    )
+    experience = term_ngrams(experience_text)
+    everything = experience | term_ngrams(other_text) | {normalize(skill) for skill in listed}
+    for skill in listed:
+        everything |= term_ngrams(skill)
+    return everything, experience
+
+def _present(terms: list[str], vocabulary: set[tuple[str, ...]]) -> np.ndarray:
+    return np.fromiter((normalize(term) in vocabulary for term in terms), dtype=bool, count=len(terms))
+
+def _percent(hits: np.ndarray) -> float:
+    return round(float(hits.mean()) * 100, 1) if len(hits) else 100.0
+
+def _latest_year(resume: ParsedResume) -> int | None:
+    dates = [d for entry in resume.experience + resume.education for d in (entry.start_date, entry.end_date)]
+    years = [int(year) for d in dates for year in _DATE_YEAR_RE.findall(d or "")]
+    return max(years) if years else None
+
+def _years_of_experience(resume: ParsedResume, as_of: int | None = None) -> float:
+    # "Present" runs to as_of, by default the latest year the resume itself mentions,
+    # so the same resume scores the same on every day
+    as_of = as_of if as_of is not None else _latest_year(resume)
+    total = 0
+    for job in resume.experience:
+        start = _DATE_YEAR_RE.search(job.start_date or "")
+        end = _DATE_YEAR_RE.search(job.end_date or "")
+        if start:
+            total += max(0, (int(end.group(1)) if end else as_of) - int(start.group(1)))
+    return total
+
+def _required_years(jd: JDAnalysis) -> float:
+    match = _YEARS_RE.search(jd.experience_years or "")
+    return float(match.group(1)) if match else 0.0
+
+def score_match(resume: ParsedResume, jd: JDAnalysis, as_of: int | None = None) -> ScoreCard:
+    """Deterministic ATS numbers from set operations over normalized terms.
+
+    ``as_of`` is the year ongoing roles are counted up to; pass one to pin
+    tenure to a reference date instead of the resume's own latest year.
+    """
+    vocabulary, experience_vocabulary = resume_terms(resume)
+
+    # Deduplicate required skills by their normalized form, keeping JD order
+    unique: dict[tuple[str, ...], str] = {}
+    for skill in jd.required_skills:
+        unique.setdefault(normalize(skill), skill)
+    unique.pop((), None)
+    required = list(unique.values())
+    skill_hits = _present(required, vocabulary)
+    keyword_hits = _present(jd.ats_keywords, vocabulary)
+
+    # Experience relevance: required and preferred skills used in actual roles, and tenure
+    role_terms = required + jd.preferred_skills
+    in_roles = _present(role_terms, experience_vocabulary).mean() if role_terms else 1.0
+    required_years = _required_years(jd)
+    tenure = min(1.0, _years_of_experience(resume, as_of) / required_years) if required_years else 1.0
+    experience = 0.5 * in_roles + 0.5 * tenure
+
+    education = 1.0 if resume.education else 0.5
+    components = np.array([
+        skill_hits.mean() if len(skill_hits) else 1.0,
+        experience,
+        keyword_hits.mean() if len(keyword_hits) else 1.0,
+        education
+    ])
+    ats_score = int(round(float(components @ WEIGHTS) * 100))
+
+    return ScoreCard(
+        ats_score=max(0, min(100, ats_score)),
+        skill_overlap_percent=_percent(skill_hits),
+        keyword_coverage=_percent(keyword_hits),
+        matched_skills=[s for s, hit in zip(required, skill_hits) if hit],
+        missing_skills=[s for s, hit in zip(required, skill_hits) if not hit]
+    )
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Annotated, get_args, get_origin
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: type[BaseModel], name: str) -> TypeAdapter:
+    field = model.model_fields[name]
+    return TypeAdapter(Annotated[field.annotation, field])
+
+@lru_cache(maxsize=None)
+def _item_adapter(model: type[BaseModel], name: str) -> TypeAdapter | None:
+    annotation = model.model_fields[name].annotation
+    if get_origin(annotation) is list and get_args(annotation):
+        return TypeAdapter(get_args(annotation)[0])
+    return None
+
+def _message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    where = ".".join(str(part) for part in first["loc"])
+    return f"{where}: {first['msg']}" if where else first["msg"]
+
+def check_output(
+    model: type[BaseModel],
+    data: dict,
+    include: set[str] | None = None
+) -> tuple[dict, dict[str, str], dict[str, object]]:
+    """Validate a reply field by field against ``model``.
+
+    Returns the values that validated, an error message per invalid field,
+    and the offending value per invalid field. List fields are checked item
+    by item: valid items are kept and only the invalid ones are reported.
+    """
+    valid: dict = {}
+    errors: dict[str, str] = {}
+    rejected: dict[str, object] = {}
+    for name, field in model.model_fields.items():
+        if include is not None and name not in include:
+            continue
+        if name not in data:
+            if field.is_required():
+                errors[name] = "missing"
+                rejected[name] = None
+            continue
+        value = data[name]
+        item_adapter = _item_adapter(model, name)
+        if item_adapter is not None and isinstance(value, list):
+            good, bad = [], []
+            for item in value:
+                try:
+                    good.append(item_adapter.validate_python(item))
+                except ValidationError as e:
+                    bad.append((item, _message(e)))
+            valid[name] = good
+            if bad:
+                errors[name] = f"{len(bad)} invalid item(s), first: {bad[0][1]}"
+                rejected[name] = [item for item, _ in bad]
+            continue
+        try:
+            valid[name] = _field_adapter(model, name).validate_python(value)
+        except ValidationError as e:
+            errors[name] = _message(e)
+            rejected[name] = value
+    return valid, errors, rejected
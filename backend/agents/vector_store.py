@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from pathlib import Path
+from config import get_settings
+from .registry import EMBEDDING_MODEL
+import json
+import numpy as np
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is then only safe within one process
+    fcntl = None
+
+class EmbeddingStore:
+    """Append-only, memory-mapped store of embedding vectors keyed by string.
+
+    Vectors live in one flat ``vectors.bin`` array and keys in ``keys.log``;
+    row i of the array belongs to line i of the log and a later duplicate
+    key wins. Several worker processes can map the same files: writers
+    append under an exclusive file lock, readers take a shared lock and
+    pick up new rows by reading only the tail of the key log. When the
+    vector file outgrows ``max_bytes`` the oldest rows are evicted by
+    compaction.
+    """
+
+    def __init__(self, path: str | Path, dtype: str = "float32", max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._keys_path = self.path / "keys.log"
+        self._vectors_path = self.path / "vectors.bin"
+        self._meta_path = self.path / "meta.json"
+        self._lock_path = self.path / "lock"
+        self._mutex = threading.Lock()
+        self._index: dict[str, int] = {}
+        self._rows = 0
+        self._log_offset = 0
+        self._log_inode = None
+        self._vectors: np.ndarray | None = None
+
+        meta = self._read_meta()
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        self.dim: int | None = meta.get("dim")
+
+    def __len__(self) -> int:
+        with self._mutex, self._file_lock(shared=True):
+            self._refresh()
+            return len(self._index)
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        with self._mutex, self._file_lock(shared=True):
+            self._refresh()
+            found = {}
+            for key in keys:
+                row = self._index.get(key)
+                if row is not None:
+                    found[key] = np.array(self._vectors[row], dtype=np.float32)
+            return found
+
+    def put_many(self, keys: list[str], vectors: np.ndarray):
+        if not keys:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if vectors.ndim != 2 or len(vectors) != len(keys):
+            raise ValueError("Expected one vector per key")
+
+        with self._mutex, self._file_lock(shared=False):
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._meta_path.write_text(json.dumps({"dim": self.dim, "dtype": self.dtype.name}))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+            # Vectors first: readers size the array from the key log
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+            self._refresh()
+
+            if self._vectors_path.stat().st_size > self.max_bytes:
+                self._compact(int(self.max_bytes * 0.8))
+                self._refresh()
+
+    def compact(self, max_bytes: int | None = None):
+        """Drop superseded rows and, if needed, the oldest rows to fit ``max_bytes``."""
+        with self._mutex, self._file_lock(shared=False):
+            self._refresh()
+            self._compact(self.max_bytes if max_bytes is None else max_bytes)
+            self._refresh()
+
+    def _compact(self, max_bytes: int):
+        if self.dim is None:
+            return
+        row_bytes = self.dim * self.dtype.itemsize
+        live = sorted(self._index.items(), key=lambda item: item[1])
+        live = live[max(0, len(live) - max_bytes // row_bytes):]
+
+        rows = [row for _, row in live]
+        kept = np.ascontiguousarray(self._vectors[rows]) if rows else np.empty((0, self.dim), self.dtype)
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        tmp_keys = self._keys_path.with_suffix(".tmp")
+        tmp_vectors.write_bytes(kept.tobytes())
+        tmp_keys.write_text("".join(f"{key}\n" for key, _ in live), encoding="utf-8")
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_keys, self._keys_path)
+
+    def _refresh(self):
+        """Bring the in-memory index up to date with the files on disk."""
+        try:
+            stat = self._keys_path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            # Compacted by this or another process: rebuild from scratch
+            self._reset()
+            self._log_inode = stat.st_ino
+            if self.dim is None:
+                self.dim = self._read_meta().get("dim")
+
+        if stat.st_size > self._log_offset:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._log_offset)
+                chunk = f.read(stat.st_size - self._log_offset)
+            complete = chunk[:chunk.rfind(b"\n") + 1]
+            for key in complete.decode("utf-8").splitlines():
+                self._index[key] = self._rows
+                self._rows += 1
+            self._log_offset += len(complete)
+
+        mapped = 0 if self._vectors is None else len(self._vectors)
+        if self._rows != mapped:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self.dim))
+
+    def _reset(self):
+        self._index = {}
+        self._rows = 0
+        self._log_offset = 0
+        self._log_inode = None
+        self._vectors = None
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self._meta_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _file_lock(self, shared: bool):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+_job_store: EmbeddingStore | None = None
+_job_store_lock = threading.Lock()
+
+def get_job_embedding_store() -> EmbeddingStore | None:
+    """Shared job-embedding store, or None when job_embedding_dir is unset."""
+    global _job_store
+    settings = get_settings()
+    if not settings.job_embedding_dir:
+        return None
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = EmbeddingStore(
+                    Path(settings.job_embedding_dir) / EMBEDDING_MODEL,
+                    dtype=settings.job_embedding_dtype,
+                    max_bytes=settings.job_embedding_max_bytes
+                )
+    return _job_store
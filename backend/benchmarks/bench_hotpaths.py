@@ -0,0 +1,249 @@
+"""Microbenchmarks for the CPU-bound hot paths, saved as JSON for cross-commit comparison.
+
+Covers PDF and DOCX text extraction at 1, 5 and 20 pages, JSON recovery
+from realistic LLM replies, job ranking over 10, 100 and 1000 postings,
+UIFormatterAgent and ParsedResume validation and serialisation. Every
+fixture is synthetic; names, emails and companies are invented.
+
+Job ranking uses a deterministic hashing embedder so the numbers measure
+this code rather than the sentence-transformers forward pass; pass
+--real-embedder to include the model.
+
+    python benchmarks/bench_hotpaths.py [--filter rank] [--output out.json]
+    python benchmarks/bench_hotpaths.py --compare benchmarks/results/<old>.json
+
+With --compare, any benchmark whose median is more than --threshold slower
+than the baseline is reported and the exit status is 1.
+"""
+from pathlib import Path
+from typing import Callable
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import zlib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import get_settings
+from models.schemas import JobPosting, ParsedResume
+import numpy as np
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PAGE_COUNTS = (1, 5, 20)
+POSTING_COUNTS = (10, 100, 1000)
+LINES_PER_PAGE = 40
+
+SKILLS = ["Python", "Go", "SQL", "TypeScript", "FastAPI", "Django", "React", "Docker", "Kubernetes", "AWS", "Terraform", "PostgreSQL"]
+
+def resume_dict(roles: int = 4) -> dict:
+    return {
+        "name": "Alex Example",
+        "email": "alex@example.com",
+        "phone": "(555) 010-0000",
+        "location": "Springfield",
+        "summary": "Backend engineer building Python APIs and data pipelines.",
+        "skills": {"languages": SKILLS[:4], "frameworks": SKILLS[4:7], "tools": SKILLS[7:]},
+        "experience": [
+            {
+                "title": "Software Engineer",
+                "company": f"Company {i}",
+                "start_date": str(2010 + 2 * i),
+                "end_date": str(2012 + 2 * i),
+                "bullets": [f"Built service {i}.{j} in Python handling {j + 1}M requests a day" for j in range(5)]
+            }
+            for i in range(roles)
+        ],
+        "education": [{"degree": "B.S.", "field": "Computer Science", "institution": "State University", "end_date": "2010"}],
+        "projects": [{"name": "Trailhead", "description": "Offline-first hiking app", "technologies": ["React", "Go"]}],
+        "certifications": ["Cloud Practitioner"]
+    }
+
+def resume_line(page: int, line: int) -> str:
+    return f"Page {page} line {line}: led the migration of service {line} to FastAPI and Kubernetes"
+
+def make_pdf(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        for line in range(LINES_PER_PAGE):
+            page.insert_text((50, 40 + line * 18), resume_line(number, line), fontsize=9)
+    return doc.tobytes()
+
+def make_docx(pages: int) -> bytes:
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+
+    doc = Document()
+    for number in range(pages):
+        for line in range(LINES_PER_PAGE):
+            doc.add_paragraph(resume_line(number, line))
+        doc.paragraphs[-1].add_run().add_break(WD_BREAK.PAGE)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+# Replies as models actually send them: fenced, with trailing commas, and cut off at max_tokens
+LLM_REPLIES = {
+    "clean": json.dumps(resume_dict()),
+    "fenced": "Here is the parsed resume:\n```json\n" + json.dumps(resume_dict(), indent=2) + "\n```",
+    "trailing_commas": json.dumps(resume_dict(), indent=2).replace("\n  }", ",\n  }").replace("\n  ]", ",\n  ]"),
+    "truncated": json.dumps(resume_dict())[:-120]
+}
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder; stands in for SentenceTransformer."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+def make_postings(count: int) -> list[JobPosting]:
+    return [
+        JobPosting(
+            title=f"{SKILLS[i % len(SKILLS)]} Engineer",
+            company=f"Company {i}",
+            location="Remote",
+            description=" ".join(SKILLS[(i + j) % len(SKILLS)] for j in range(6)) + f" services for team {i}",
+            url=f"https://jobs.example.com/{i}",
+            source="bench"
+        )
+        for i in range(count)
+    ]
+
+def run_sync(coro):
+    """Drive a coroutine that never actually suspends, without event loop overhead."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("coroutine suspended; benchmark it with an event loop instead")
+
+def build_benchmarks(real_embedder: bool) -> dict[str, Callable[[], object]]:
+    from agents.job_search import JobSearchAgent
+    from agents.resume_parser import ResumeParserAgent
+    from agents.ui_formatter import UIFormatterAgent
+
+    settings = get_settings()
+    # Keep ranking free of side effects: no shared embedding store or local corpus
+    settings.job_embedding_dir = ""
+    settings.job_index_enabled = False
+
+    parser = ResumeParserAgent()
+    formatter = UIFormatterAgent()
+    searcher = JobSearchAgent()
+    if not real_embedder:
+        searcher._embedder = HashingEmbedder()
+    resume = ParsedResume(**resume_dict())
+    resume_data = resume_dict()
+    match = {"ats_score": 62, "missing_skills": ["Rust", "Kafka", "Spark"], "strengths": ["Python"], "gaps": ["Streaming"]}
+
+    benchmarks = {}
+    for pages in PAGE_COUNTS:
+        pdf, docx = make_pdf(pages), make_docx(pages)
+        benchmarks[f"extract_pdf[{pages}p]"] = lambda pdf=pdf: parser._extract_pdf(pdf)
+        benchmarks[f"extract_docx[{pages}p]"] = lambda docx=docx: parser._extract_docx(docx)
+    for name, reply in LLM_REPLIES.items():
+        benchmarks[f"parse_json[{name}]"] = lambda reply=reply: parser._parse_json(reply)
+    for count in POSTING_COUNTS:
+        postings = make_postings(count)
+        benchmarks[f"rank_jobs[{count}]"] = lambda postings=postings: searcher._rank_jobs(postings, resume, top_k=10)
+    benchmarks["ui_formatter[match]"] = lambda: run_sync(formatter.execute(match, "match"))
+    benchmarks["ui_formatter[jobs]"] = lambda: run_sync(formatter.execute({"jobs": []}, "jobs"))
+    benchmarks["parsed_resume[validate]"] = lambda: ParsedResume(**resume_data)
+    benchmarks["parsed_resume[dump]"] = lambda: resume.model_dump()
+    benchmarks["parsed_resume[dump_json]"] = lambda: resume.model_dump_json()
+    return benchmarks
+
+def measure(fn: Callable[[], object], repeats: int, min_time: float) -> dict:
+    timer = timeit.Timer(fn)
+    # Enough calls per sample that each sample runs for at least min_time
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    samples = [t / number for t in timer.repeat(repeat=repeats, number=number)]
+    return {
+        "calls_per_sample": number,
+        "min_us": round(min(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(samples) * 1e6, 3) if len(samples) > 1 else 0.0
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        change = result["median_us"] / old["median_us"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{name:<28}{old['median_us']:>14.1f}{result['median_us']:>14.1f}{change:>+9.1%}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=7, help="timed samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per sample")
+    parser.add_argument("--output", type=Path, help="JSON results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    parser.add_argument("--real-embedder", action="store_true", help="rank jobs with the configured embedding model")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {}
+    print(f"{'benchmark':<28}{'median us':>14}{'min us':>14}")
+    for name, fn in build_benchmarks(args.real_embedder).items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(fn, args.repeats, args.min_time)
+        print(f"{name:<28}{results[name]['median_us']:>14.1f}{results[name]['min_us']:>14.1f}")
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }, indent=2))
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        print(f"\n{'benchmark':<28}{'baseline us':>14}{'current us':>14}{'change':>9}")
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Profile the cold-start cost of importing the API.
+
+Imports a module (main by default) in fresh interpreters under
+``python -X importtime``. Reports the median total import time, the
+slowest modules by cumulative and by self time, and which heavy
+dependencies were loaded eagerly. Those should all be deferred to first
+use or to the warm-up phase.
+
+    python benchmarks/bench_import.py [--module main] [--runs 5] [--top 15] [--output import.json]
+"""
+from pathlib import Path
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["langgraph", "langchain_core", "groq", "fitz", "pdfplumber", "docx", "sentence_transformers", "torch", "faiss", "numpy", "httpx"]
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+PROBE = """
+import sys
+import {module}
+print("HEAVY " + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def profile_once(module: str) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, cwd=BACKEND_DIR, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    heavy = next(line[6:] for line in result.stdout.splitlines() if line.startswith("HEAVY "))
+    return timings, [m for m in heavy.split(",") if m]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    runs = [profile_once(args.module) for _ in range(args.runs)]
+    totals = [timings[args.module][1] for timings, _ in runs]
+    # Per-module medians across runs smooth out disk cache and scheduling noise
+    modules = {name for timings, _ in runs for name in timings}
+    cumulative = {m: statistics.median(t[m][1] for t, _ in runs if m in t) for m in modules}
+    own = {m: statistics.median(t[m][0] for t, _ in runs if m in t) for m in modules}
+    heavy = runs[-1][1]
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.0f} ms over {args.runs} runs")
+    print(f"\n{'cumulative ms':>14}  module")
+    for name in sorted(cumulative, key=cumulative.get, reverse=True)[1:args.top + 1]:
+        print(f"{cumulative[name] / 1000:>14.1f}  {name}")
+    print(f"\n{'self ms':>14}  module")
+    for name in sorted(own, key=own.get, reverse=True)[:args.top]:
+        print(f"{own[name] / 1000:>14.1f}  {name}")
+    print(f"\nHeavy modules loaded at import: {', '.join(heavy) or 'none'}")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "module": args.module,
+            "median_ms": statistics.median(totals) / 1000,
+            "runs_ms": [t / 1000 for t in totals],
+            "heavy_loaded": heavy,
+            "top_cumulative_ms": {n: cumulative[n] / 1000 for n in sorted(cumulative, key=cumulative.get, reverse=True)[:args.top]}
+        }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Local stand-ins for the Groq chat-completions API and the job boards, for offline load tests.
+
+The Groq stand-in answers /openai/v1/chat/completions, streamed or not,
+with a simulated delay of base latency + prompt tokens / prefill rate +
+completion tokens / generation rate. It can inject 429 or 5xx errors at a
+given rate. Its reply is one JSON object that validates as every agent's
+output schema, so any pipeline runs end to end.
+
+The job board stand-in serves Adzuna, JSearch and Remotive. Point the app
+at it with JOB_BOARD_BASE_URL; the original host arrives in
+X-Forwarded-Host. Responses come from a cassette and fall back to
+synthetic postings.
+
+With --record, cassette misses are forwarded to the real APIs once and
+saved; API keys are dropped from cassette keys and never stored.
+
+    python benchmarks/fake_services.py --groq-port 8101 --jobs-port 8102 [--cassette c.json] [--record]
+"""
+from pathlib import Path
+from urllib.parse import urlencode
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import httpx
+
+GROQ_UPSTREAM = "https://api.groq.com"
+SECRET_PARAMS = {"app_id", "app_key"}
+
+# Validates as ParsedResume, JDAnalysis, MatchResult and ImprovementSuggestions
+LLM_REPLY = {
+    "name": "Alex Example",
+    "email": "alex@example.com",
+    "summary": "Backend engineer building Python APIs.",
+    "skills": {"languages": ["Python", "SQL"], "frameworks": ["FastAPI"], "tools": ["Docker"]},
+    "experience": [{"company": "Company A", "title": "Software Engineer", "bullets": ["Built billing APIs in Python"]}],
+    "title": "Backend Engineer",
+    "required_skills": ["Python", "FastAPI", "Kubernetes"],
+    "ats_keywords": ["python", "api", "microservices"],
+    "experience_years": "3+ years",
+    "ats_score": 70,
+    "skill_overlap_percent": 66.7,
+    "keyword_coverage": 66.7,
+    "experience_match": "Meets requirements",
+    "strengths": ["Python APIs"],
+    "gaps": ["Kubernetes"],
+    "improvements": [
+        {
+            "section": "experience",
+            "original": f"Built billing APIs in Python {i}",
+            "suggested": f"Built billing microservices in Python and FastAPI serving {i + 1}M requests a day",
+            "reason": "Quantifies impact and adds ATS keywords",
+            "severity": "medium",
+            "keywords_added": ["microservices"]
+        }
+        for i in range(3)
+    ],
+    "missing_keywords": ["Kubernetes"],
+    "overall_tips": ["Lead with quantified outcomes"]
+}
+
+def synthetic_jobs(host: str, query: str, count: int = 10) -> dict:
+    postings = [
+        {
+            "title": f"{query.split()[0] if query else 'Software'} Engineer {i}",
+            "company": f"Company {i}",
+            "description": f"Build {query} services with a small team. Role {i}.",
+            "url": f"https://jobs.example.com/{host}/{i}"
+        }
+        for i in range(count)
+    ]
+    if "adzuna" in host:
+        return {"results": [
+            {"title": p["title"], "company": {"display_name": p["company"]}, "location": {"display_name": "Remote"},
+             "redirect_url": p["url"], "salary_min": 100000, "salary_max": 150000, "description": p["description"]}
+            for p in postings
+        ]}
+    if "jsearch" in host:
+        return {"data": [
+            {"job_title": p["title"], "employer_name": p["company"], "job_city": "Remote", "job_state": "",
+             "job_apply_link": p["url"], "job_salary": "", "job_description": p["description"]}
+            for p in postings
+        ]}
+    return {"jobs": [
+        {"title": p["title"], "company_name": p["company"], "url": p["url"], "salary": "", "description": p["description"]}
+        for p in postings
+    ]}
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class Cassette:
+    """Recorded responses keyed by request, saved as one JSON file."""
+
+    def __init__(self, path: str | Path | None, record: bool = False):
+        self.path = Path(path) if path else None
+        self.record = record
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            self.entries = json.loads(self.path.read_text())
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self.entries[key] = entry
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+
+def groq_key(body: dict) -> str:
+    request = {k: body.get(k) for k in ("model", "messages", "response_format", "temperature")}
+    return "groq:" + hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()[:32]
+
+def job_board_key(host: str, path: str, params: dict) -> str:
+    public = sorted((k, v) for k, v in params.items() if k not in SECRET_PARAMS)
+    return f"jobs:{host}{path}?{urlencode(public)}"
+
+def create_groq_app(
+    base_latency: float = 0.2,
+    prefill_tps: float = 5000,
+    tokens_per_second: float = 500,
+    error_rate: float = 0.0,
+    error_status: int = 429,
+    retry_after: float = 1.0,
+    cassette: Cassette | None = None,
+    seed: int | None = None
+) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(seed)
+    cassette = cassette or Cassette(None)
+    app.state.calls = 0
+
+    async def upstream(body: dict, authorization: str) -> dict:
+        async with httpx.AsyncClient(timeout=120) as client:
+            response = await client.post(
+                f"{GROQ_UPSTREAM}/openai/v1/chat/completions",
+                json={**body, "stream": False},
+                headers={"Authorization": authorization}
+            )
+        response.raise_for_status()
+        data = response.json()
+        return {"content": data["choices"][0]["message"]["content"], "usage": data.get("usage")}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        if rng.random() < error_rate:
+            headers = {"retry-after": str(retry_after)} if error_status == 429 else {}
+            return JSONResponse({"error": {"message": "injected failure"}}, status_code=error_status, headers=headers)
+
+        key = groq_key(body)
+        recorded = cassette.get(key)
+        if recorded is None and cassette.record:
+            recorded = await upstream(body, request.headers.get("authorization", ""))
+            cassette.put(key, recorded)
+        content = recorded["content"] if recorded else json.dumps(LLM_REPLY)
+
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in body.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": f"chatcmpl-{app.state.calls}", "created": int(time.time()), "model": body.get("model", "")}
+        await asyncio.sleep(base_latency + prompt_tokens / prefill_tps)
+
+        if not body.get("stream"):
+            await asyncio.sleep(completion_tokens / tokens_per_second)
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        async def events():
+            # Eight-token chunks paced at the generation rate
+            step = 32
+            for start in range(0, len(content), step):
+                await asyncio.sleep(8 / tokens_per_second)
+                delta = {"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}
+                yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [delta]})}\n\n"
+            done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [done], 'x_groq': {'usage': usage}})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def create_job_board_app(latency: float = 0.1, cassette: Cassette | None = None) -> FastAPI:
+    app = FastAPI()
+    cassette = cassette or Cassette(None)
+
+    @app.get("/{path:path}")
+    async def search(path: str, request: Request):
+        host = request.headers.get("x-forwarded-host", "")
+        params = dict(request.query_params)
+        key = job_board_key(host, f"/{path}", params)
+        recorded = cassette.get(key)
+        if recorded is None and cassette.record and host:
+            headers = {k: v for k, v in request.headers.items() if k.lower().startswith("x-rapidapi")}
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(f"https://{host}/{path}", params=params, headers=headers)
+            recorded = {"status": response.status_code, "json": response.json()}
+            cassette.put(key, recorded)
+        if recorded is None:
+            query = params.get("what") or params.get("query") or params.get("search") or ""
+            recorded = {"status": 200, "json": synthetic_jobs(host, query)}
+        await asyncio.sleep(latency)
+        return JSONResponse(recorded["json"], status_code=recorded["status"])
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groq-port", type=int, default=8101)
+    parser.add_argument("--jobs-port", type=int, default=8102)
+    parser.add_argument("--base-latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--prefill-tps", type=float, default=5000, help="prompt tokens processed per second")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="completion tokens generated per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of LLM calls that fail")
+    parser.add_argument("--error-status", type=int, default=429, help="status code of injected failures")
+    parser.add_argument("--job-latency", type=float, default=0.1, help="seconds per job board request")
+    parser.add_argument("--cassette", type=Path, help="JSON file of recorded responses")
+    parser.add_argument("--record", action="store_true", help="forward cassette misses to the real APIs and save them")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    import uvicorn
+
+    cassette = Cassette(args.cassette, args.record)
+    groq_app = create_groq_app(
+        args.base_latency, args.prefill_tps, args.tokens_per_second,
+        args.error_rate, args.error_status, cassette=cassette, seed=args.seed
+    )
+    jobs_app = create_job_board_app(args.job_latency, cassette)
+
+    async def serve():
+        servers = [
+            uvicorn.Server(uvicorn.Config(groq_app, port=args.groq_port, log_level="warning")),
+            uvicorn.Server(uvicorn.Config(jobs_app, port=args.jobs_port, log_level="warning"))
+        ]
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
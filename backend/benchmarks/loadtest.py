@@ -0,0 +1,287 @@
+"""Offline end-to-end load test of main.app against local Groq and job board stand-ins.
+
+Starts benchmarks/fake_services.py and the API under uvicorn with the
+given number of workers, then drives each endpoint at each concurrency
+level for a fixed duration. Reports throughput, p50/p95/p99 latency, error
+count, peak RSS of the API process tree and mean event loop lag (from
+/metrics of whichever worker answers). Nothing leaves the machine unless
+the stand-ins run with --record; the job search endpoint additionally
+needs the embedding model in the local Hugging Face cache.
+
+    python benchmarks/loadtest.py [--endpoints parse,full] [--concurrency 1,8,32] [--workers 1]
+    python benchmarks/loadtest.py --error-rate 0.05 --tokens-per-second 200 --output load.json
+
+Peak RSS is read from /proc, so it is reported on Linux only.
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from bench_hotpaths import resume_dict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FAKE_SERVICES = Path(__file__).resolve().parent / "fake_services.py"
+
+RESUME_TEXT = """Alex Example
+Springfield | alex@example.com | (555) 010-0000
+
+Summary
+Backend engineer with 6 years building Python APIs and data pipelines.
+
+Experience
+Senior Software Engineer | Company A | Jan 2021 - Present
+- Led migration of billing services to FastAPI, cutting p95 latency 40%
+- Designed an event-driven invoicing pipeline processing 3M events/day
+Software Engineer | Company B | 06/2018 - 12/2020
+- Built ETL pipelines in Python and Airflow processing 2TB/day
+
+Education
+B.S. in Computer Science | State University | 2014 - 2018
+
+Skills
+Languages: Python, Go, SQL
+Frameworks: FastAPI, Django
+Tools: Docker, Kubernetes, AWS
+"""
+
+JD_TEXT = """Backend Engineer at Company C. We need 3+ years of Python, FastAPI and
+Kubernetes experience building microservices. You will design APIs, own
+deployments and mentor engineers. Nice to have: Terraform, Kafka."""
+
+JD = {"title": "Backend Engineer", "required_skills": ["Python", "FastAPI", "Kubernetes"], "ats_keywords": ["python", "api", "microservices"]}
+MATCH = {"ats_score": 70, "skill_overlap_percent": 66.7, "keyword_coverage": 66.7, "missing_skills": ["Kubernetes"]}
+
+def resume_file(i: int) -> dict:
+    import fitz
+
+    # A distinct document per request so the resume caches do not answer
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(50, 50, 560, 800), f"{RESUME_TEXT}\nRef {i}\n", fontsize=10)
+    return {"file": ("resume.pdf", doc.tobytes(), "application/pdf")}
+
+# Endpoint name -> request for the i-th call
+ENDPOINTS = {
+    "parse": lambda c, i: c.post("/api/resume/parse", files=resume_file(i)),
+    "jd": lambda c, i: c.post("/api/jd/analyze", json={"jd_text": f"{JD_TEXT} Ref {i}."}),
+    "match": lambda c, i: c.post("/api/match", json={"resume": resume_dict(i % 4 + 1), "jd": JD}),
+    "improve": lambda c, i: c.post("/api/improve", json={"resume": resume_dict(i % 4 + 1), "jd": JD, "match": MATCH}),
+    "full": lambda c, i: c.post("/api/analyze/full", files=resume_file(i), data={"jd_text": JD_TEXT}),
+    "stream": lambda c, i: c.post("/api/analyze/full/stream", files=resume_file(i), data={"jd_text": JD_TEXT}),
+    "search": lambda c, i: c.post("/api/jobs/search-from-parsed", json=resume_dict(i % 4 + 1))
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+class RSSSampler(threading.Thread):
+    """Polls the resident memory of a process and its children; Linux only."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._halt = threading.Event()
+
+    def reset(self) -> int:
+        peak, self.peak = self.peak, 0
+        return peak
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            self.peak = max(self.peak, sum(self._rss(pid) for pid in self._tree(self.pid)))
+
+    def stop(self):
+        self._halt.set()
+
+    def _tree(self, pid: int) -> list[int]:
+        try:
+            children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+        except OSError:
+            return [pid]
+        return [pid] + [p for child in children for p in self._tree(int(child))]
+
+    def _rss(self, pid: int) -> int:
+        try:
+            status = Path(f"/proc/{pid}/status").read_text()
+        except OSError:
+            return 0
+        match = re.search(r"VmRSS:\s+(\d+) kB", status)
+        return int(match.group(1)) * 1024 if match else 0
+
+def loop_lag(metrics_text: str) -> tuple[float, float]:
+    """Sum and count of the event loop lag histogram in a /metrics scrape."""
+    values = dict(re.findall(r"^resumex_event_loop_lag_seconds_(sum|count) (\S+)$", metrics_text, re.M))
+    return float(values.get("sum", 0)), float(values.get("count", 0))
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, duration: float) -> dict:
+    send = ENDPOINTS[endpoint]
+    latencies, errors = [], 0
+    counter = iter(range(10 ** 9))
+    lag_before = loop_lag((await client.get("/metrics")).text)
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await send(client, next(counter))
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    lag_after = loop_lag((await client.get("/metrics")).text)
+
+    latencies.sort()
+    lag_samples = lag_after[1] - lag_before[1]
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "loop_lag_ms": round((lag_after[0] - lag_before[0]) / lag_samples * 1000, 2) if lag_samples > 0 else None
+    }
+
+async def drive(app_url: str, endpoints: list[str], levels: list[int], duration: float, sampler: RSSSampler | None) -> list[dict]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels) + 2, max_keepalive_connections=max(levels) + 2)
+    async with httpx.AsyncClient(base_url=app_url, timeout=300, limits=limits) as client:
+        print(f"{'endpoint':<10}{'conc':>6}{'reqs':>7}{'err':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'lag ms':>9}{'peak MB':>10}")
+        for endpoint in endpoints:
+            for concurrency in levels:
+                if sampler:
+                    sampler.reset()
+                result = await run_level(client, endpoint, concurrency, duration)
+                result["peak_rss_mb"] = round(sampler.reset() / 2 ** 20, 1) if sampler else None
+                results.append(result)
+                lag = f"{result['loop_lag_ms']:.2f}" if result["loop_lag_ms"] is not None else "-"
+                rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "-"
+                print(
+                    f"{endpoint:<10}{concurrency:>6}{result['requests']:>7}{result['errors']:>5}{result['throughput_rps']:>9.1f}"
+                    f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{lag:>9}{rss:>10}"
+                )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="parse,jd,match,improve,full,stream", help=f"comma-separated: {','.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint and level")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the API")
+    parser.add_argument("--app-url", help="load an already running API instead of starting one (no RSS)")
+    parser.add_argument("--base-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--cassette", type=Path, help="recorded responses for the stand-ins")
+    parser.add_argument("--record", action="store_true", help="let the stand-ins capture missing responses from the real APIs")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    processes, sampler = [], None
+    try:
+        app_url = args.app_url
+        if not app_url:
+            groq_port, jobs_port, app_port = free_port(), free_port(), free_port()
+            fake_cmd = [
+                sys.executable, str(FAKE_SERVICES),
+                "--groq-port", str(groq_port), "--jobs-port", str(jobs_port),
+                "--base-latency", str(args.base_latency), "--tokens-per-second", str(args.tokens_per_second),
+                "--error-rate", str(args.error_rate), "--error-status", str(args.error_status)
+            ]
+            if args.cassette:
+                fake_cmd += ["--cassette", str(args.cassette)] + (["--record"] if args.record else [])
+            processes.append(subprocess.Popen(fake_cmd))
+            wait_ready(f"http://127.0.0.1:{jobs_port}/health", processes[-1])
+
+            env = {
+                **os.environ,
+                "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "offline") if args.record else "offline",
+                "GROQ_BASE_URL": f"http://127.0.0.1:{groq_port}",
+                "JOB_BOARD_BASE_URL": f"http://127.0.0.1:{jobs_port}",
+                "ADZUNA_APP_ID": os.environ.get("ADZUNA_APP_ID", "offline"),
+                "ADZUNA_API_KEY": os.environ.get("ADZUNA_API_KEY", "offline"),
+                "JSEARCH_API_KEY": os.environ.get("JSEARCH_API_KEY", "offline"),
+                # Every request must reach the stand-ins, and nothing may download models
+                "LLM_CACHE_ENABLED": "false",
+                "JOB_INDEX_ENABLED": "false",
+                "HF_HUB_OFFLINE": "1",
+                "TRANSFORMERS_OFFLINE": "1"
+            }
+            app_url = f"http://127.0.0.1:{app_port}"
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env
+            ))
+            wait_ready(app_url, processes[-1])
+            if Path("/proc").exists():
+                sampler = RSSSampler(processes[-1].pid)
+                sampler.start()
+
+        results = asyncio.run(drive(app_url, endpoints, levels, args.duration, sampler))
+        if args.output:
+            args.output.write_text(json.dumps({
+                "workers": args.workers,
+                "duration": args.duration,
+                "llm": {"base_latency": args.base_latency, "tokens_per_second": args.tokens_per_second, "error_rate": args.error_rate},
+                "results": results
+            }, indent=2))
+            print(f"\nSaved {args.output}")
+    finally:
+        if sampler:
+            sampler.stop()
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
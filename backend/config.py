@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     remotive_api_key: str = ""
     tavily_api_key: str = ""
     
+    # Send LLM and job board traffic to local stand-ins (benchmarks/fake_services.py); empty uses the real APIs
+    groq_base_url: str = ""
+    job_board_base_url: str = ""
+    
     # Groq Models (using currently available models)
     reasoning_model: str = "llama-3.3-70b-versatile"
     extraction_model: str = "llama-3.3-70b-versatile"
@@ -19,6 +23,89 @@ class Settings(BaseSettings):
     matching_temp: float = 0.3
     suggestion_temp: float = 0.5
     
+    # Prompt input budgets in estimated tokens; least relevant, oldest bullets are trimmed first
+    matching_input_tokens: int = 3000
+    improvement_input_tokens: int = 4000
+    
+    # Shared LLM connection pool
+    llm_max_connections: int = 20
+    llm_keepalive_connections: int = 10
+    llm_timeout: float = 60.0
+    
+    # LLM governor: per-model request/token rate limits (0 = unlimited; set to your Groq tier),
+    # concurrent calls per model and retries on rate-limit, connection and 5xx errors
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    llm_max_concurrency_per_model: int = 20
+    llm_max_retries: int = 4
+    
+    # Stream completions and stop once the reply's JSON object closes
+    llm_streaming: bool = True
+    # Ask for JSON-mode replies from agents with an output schema
+    llm_json_mode: bool = True
+    
+    # Resume cache (per level); set resume_cache_dir to persist across restarts
+    resume_cache_max_bytes: int = 32 * 1024 * 1024
+    resume_cache_dir: str = ""
+    
+    # Rule-based pre-parser; well-structured resumes skip the LLM entirely
+    resume_preparse_enabled: bool = True
+    
+    # LLM response cache; agents opt in through their cache_policy
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: float = 24 * 60 * 60
+    llm_cache_max_entries: int = 2000
+    llm_cache_max_bytes: int = 64 * 1024 * 1024
+    
+    # /api/match/batch: postings per request and how many are analyzed at once
+    batch_max_jds: int = 50
+    batch_concurrency: int = 8
+    
+    # Background tasks (?background=true): workers, waiting-task limit and result retention
+    task_workers: int = 4
+    task_queue_depth: int = 100
+    task_result_ttl: float = 60 * 60
+    
+    # Recruiter candidate pool; LLM matching runs only on the candidate_shortlist best pre-ranked
+    candidate_store_path: str = ""
+    candidate_shortlist: int = 20
+    
+    # Shared job board connection pool
+    job_search_max_connections: int = 20
+    job_search_timeout: float = 10.0
+    
+    # Memory-mapped job embedding cache shared by worker processes; empty disables it
+    job_embedding_dir: str = ""
+    job_embedding_dtype: str = "float32"
+    job_embedding_max_bytes: int = 256 * 1024 * 1024
+    
+    # Local job corpus; searches are answered from it once it holds job_index_min_size postings
+    job_index_enabled: bool = True
+    job_index_path: str = ""
+    job_index_min_size: int = 500
+    job_index_max_size: int = 50000
+    job_index_ttl: float = 14 * 24 * 60 * 60
+    job_index_nprobe: int = 8
+    job_index_refresh_interval: float = 10 * 60
+    
+    # Document text extraction pool: "process", or "thread" for the GIL-releasing PyMuPDF path
+    extraction_executor: str = "process"
+    extraction_workers: int = 2
+    extraction_timeout: float = 30.0
+    extraction_max_worker_memory_mb: int = 512
+    extraction_max_tasks_per_worker: int = 100
+    extraction_max_pages: int = 20
+    extraction_max_chars: int = 50000
+    
+    # Opt-in startup warm-up: graphs, embedder, extraction workers, HTTP clients and the LLM connection; /ready is 503 until done
+    warmup_enabled: bool = False
+    warmup_embedder: bool = True
+    warmup_llm_connection: bool = True
+    warmup_timeout: float = 120.0
+    
+    # /metrics: how often the event loop lag probe wakes; 0 disables it
+    metrics_loop_lag_interval: float = 0.5
+    
     class Config:
         env_file = str(Path(__file__).parent / ".env")
         case_sensitive = False
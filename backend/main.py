@@ -1,16 +1,48 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from orchestrator import get_full_analysis_graph, get_resume_only_graph, get_job_search_graph, AgentState
-from agents import JDAnalyzerAgent, MatchingAgent, ImprovementAgent, UIFormatterAgent
+from orchestrator import get_full_analysis_graph, get_resume_only_graph, get_job_search_graph, stream_full_analysis, run_match_batch, rank_candidates, AgentState
+from orchestrator.task_queue import QueueFull, get_task_queue, shutdown_task_queue
+from orchestrator.warmup import get_readiness, start_warm_up
+from agents.base import close_llm_client, get_usage
+from agents.registry import get_agent, model_memory
+from agents.job_sources import close_http_client
+from agents.job_index import save_job_index
+from agents.extraction import shutdown_extraction_pool
+from agents.candidates import get_candidate_store
+from agents.cache import get_llm_cache
+from agents.resume_parser import get_resume_caches
+from config import get_settings
 from models.schemas import ParsedResume, JDAnalysis, MatchResult, ImprovementSuggestions, JobSearchResult
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    interval = get_settings().metrics_loop_lag_interval
+    lag_probe = asyncio.create_task(metrics.monitor_loop_lag(interval)) if interval > 0 else None
+    # Warm-up runs in the background so / answers at once while /ready waits for it
+    warming = start_warm_up()
+    yield
+    for task in (lag_probe, warming):
+        if task is not None:
+            task.cancel()
+    await shutdown_task_queue()
+    # Release the pooled keep-alive connections shared by all agents
+    await close_llm_client()
+    await close_http_client()
+    save_job_index()
+    shutdown_extraction_pool()
 
 app = FastAPI(
     title="ResumeX API",
     description="AI-powered resume analysis with multi-agent orchestration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -39,33 +71,71 @@ class ImproveRequest(BaseModel):
     jd: dict
     match: dict
 
-# Lazy initialization of agents
-def get_jd_analyzer():
-    if not hasattr(get_jd_analyzer, '_instance'):
-        get_jd_analyzer._instance = JDAnalyzerAgent()
-    return get_jd_analyzer._instance
-
-def get_matcher():
-    if not hasattr(get_matcher, '_instance'):
-        get_matcher._instance = MatchingAgent()
-    return get_matcher._instance
-
-def get_improver():
-    if not hasattr(get_improver, '_instance'):
-        get_improver._instance = ImprovementAgent()
-    return get_improver._instance
-
-def get_ui_formatter():
-    if not hasattr(get_ui_formatter, '_instance'):
-        get_ui_formatter._instance = UIFormatterAgent()
-    return get_ui_formatter._instance
+class CandidateRankRequest(BaseModel):
+    jd_text: str
+    top_k: int = 10
 
 @app.get("/")
 async def root():
     return {"message": "ResumeX API", "status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the startup warm-up has finished; / stays a liveness check."""
+    readiness = get_readiness()
+    return JSONResponse(readiness.to_dict(), status_code=200 if readiness.ready else 503)
+
+@app.get("/api/models")
+async def loaded_models():
+    """Report heavy models loaded in this process and their approximate memory."""
+    return {"models": model_memory()}
+
+@app.get("/api/usage")
+async def llm_usage():
+    """Report LLM prompt/completion tokens, latency and trimmed bullets per agent."""
+    return {"agents": get_usage()}
+
+def cache_metrics():
+    caches = [get_llm_cache(), *get_resume_caches().values()]
+    for cache in caches:
+        stats = cache.stats()
+        labels = {"cache": stats["namespace"]}
+        yield "resumex_cache_hit_ratio", "Memory and disk hits over all lookups", labels, stats["hit_ratio"]
+        yield "resumex_cache_lookups", "Cache lookups since start", labels, stats["hits"] + stats["disk_hits"] + stats["misses"]
+        yield "resumex_cache_bytes", "Bytes held in memory", labels, stats["bytes"]
+
+metrics.register_collector(cache_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Expose node, LLM, job board, embedding, cache and event loop metrics for Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def enqueue(kind: str, fn, *args, idempotency_key: str | None = None) -> JSONResponse:
+    """Queue work and answer 202 with the task ID, or 429 when the queue is full."""
+    try:
+        task = get_task_queue().submit(kind, fn, *args, idempotency_key=idempotency_key)
+    except QueueFull as e:
+        raise HTTPException(429, str(e), headers={"Retry-After": str(e.retry_after)})
+    return JSONResponse(
+        {"id": task.id, "status": task.status, "status_url": f"/api/jobs/{task.id}"},
+        status_code=202
+    )
+
+@app.get("/api/jobs/{task_id}")
+async def task_status(task_id: str):
+    """Status of a background task, with its result once finished."""
+    task = get_task_queue().get(task_id)
+    if task is None:
+        raise HTTPException(404, "Unknown or expired job ID")
+    return task.to_dict()
+
 @app.post("/api/resume/parse")
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(
+    file: UploadFile = File(...),
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
     """Parse a resume file and extract structured data."""
     if not file.filename:
         raise HTTPException(400, "No file provided")
@@ -76,9 +146,14 @@ async def parse_resume(file: UploadFile = File(...)):
     
     content = await file.read()
     
+    if background:
+        return enqueue("parse_resume", run_parse_resume, content, file.filename, idempotency_key=idempotency_key)
+    return await run_parse_resume(content, file.filename)
+
+async def run_parse_resume(content: bytes, filename: str) -> dict:
     initial_state: AgentState = {
         "resume_file": content,
-        "resume_filename": file.filename,
+        "resume_filename": filename,
         "jd_text": None,
         "parsed_resume": None,
         "jd_analysis": None,
@@ -95,7 +170,7 @@ async def parse_resume(file: UploadFile = File(...)):
         raise HTTPException(500, result["error"])
     
     parsed = result["parsed_resume"]
-    formatted = await get_ui_formatter().execute(parsed.model_dump(), "resume")
+    formatted = await get_agent('ui_formatter').execute(parsed.model_dump(), "resume")
     
     return formatted.model_dump()
 
@@ -105,8 +180,8 @@ async def analyze_jd(request: JDRequest):
     if not request.jd_text.strip():
         raise HTTPException(400, "Job description text is required")
     
-    analysis = await get_jd_analyzer().execute(request.jd_text)
-    formatted = await get_ui_formatter().execute(analysis.model_dump(), "jd")
+    analysis = await get_agent('jd_analyzer').execute(request.jd_text)
+    formatted = await get_agent('ui_formatter').execute(analysis.model_dump(), "jd")
     
     return formatted.model_dump()
 
@@ -116,27 +191,73 @@ async def match_resume_jd(request: MatchRequest):
     resume = ParsedResume(**request.resume)
     jd = JDAnalysis(**request.jd)
     
-    match_result = await get_matcher().execute(resume, jd)
-    formatted = await get_ui_formatter().execute(match_result.model_dump(), "match")
+    match_result = await get_agent('matcher').execute(resume, jd)
+    formatted = await get_agent('ui_formatter').execute(match_result.model_dump(), "match")
     
     return formatted.model_dump()
 
+@app.post("/api/match/batch")
+async def match_batch(
+    file: UploadFile = File(...),
+    jd_texts: list[str] = Form(...),
+    improve_top: int = Form(0),
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Parse a resume once and match it against many job descriptions, best match first."""
+    if not file.filename:
+        raise HTTPException(400, "No file provided")
+    
+    jd_texts = [text for text in jd_texts if text.strip()]
+    if not jd_texts:
+        raise HTTPException(400, "At least one job description is required")
+    max_jds = get_settings().batch_max_jds
+    if len(jd_texts) > max_jds:
+        raise HTTPException(400, f"At most {max_jds} job descriptions per batch")
+    
+    content = await file.read()
+    
+    if background:
+        return enqueue("match_batch", run_batch, content, file.filename, jd_texts, improve_top, idempotency_key=idempotency_key)
+    return await run_batch(content, file.filename, jd_texts, improve_top)
+
+async def run_batch(content: bytes, filename: str, jd_texts: list[str], improve_top: int) -> dict:
+    try:
+        resume = await get_agent('resume_parser').execute(content, filename)
+    except Exception as e:
+        raise HTTPException(500, f"Resume parsing failed: {str(e)}")
+    
+    results = await run_match_batch(resume, jd_texts, improve_top)
+    
+    return {"resume": resume.model_dump(), "results": results}
+
 @app.post("/api/improve")
-async def get_improvements(request: ImproveRequest):
+async def get_improvements(
+    request: ImproveRequest,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
     """Get improvement suggestions for a resume based on JD."""
     resume = ParsedResume(**request.resume)
     jd = JDAnalysis(**request.jd)
     match = MatchResult(**request.match)
     
-    improvements = await get_improver().execute(resume, jd, match)
-    formatted = await get_ui_formatter().execute(improvements.model_dump(), "improvement")
+    if background:
+        return enqueue("improve", run_improvements, resume, jd, match, idempotency_key=idempotency_key)
+    return await run_improvements(resume, jd, match)
+
+async def run_improvements(resume: ParsedResume, jd: JDAnalysis, match: MatchResult) -> dict:
+    improvements = await get_agent('improver').execute(resume, jd, match)
+    formatted = await get_agent('ui_formatter').execute(improvements.model_dump(), "improvement")
     
     return formatted.model_dump()
 
 @app.post("/api/analyze/full")
 async def full_analysis(
     file: UploadFile = File(...),
-    jd_text: str = Form(...)
+    jd_text: str = Form(...),
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Run full analysis pipeline: parse resume, analyze JD, match, and suggest improvements."""
     if not file.filename:
@@ -144,9 +265,14 @@ async def full_analysis(
     
     content = await file.read()
     
+    if background:
+        return enqueue("analyze_full", run_full_analysis, content, file.filename, jd_text, idempotency_key=idempotency_key)
+    return await run_full_analysis(content, file.filename, jd_text)
+
+async def run_full_analysis(content: bytes, filename: str, jd_text: str) -> dict:
     initial_state: AgentState = {
         "resume_file": content,
-        "resume_filename": file.filename,
+        "resume_filename": filename,
         "jd_text": jd_text,
         "parsed_resume": None,
         "jd_analysis": None,
@@ -169,17 +295,96 @@ async def full_analysis(
         "improvements": result["improvements"].model_dump() if result["improvements"] else None
     }
 
+@app.post("/api/analyze/full/stream")
+async def full_analysis_stream(
+    file: UploadFile = File(...),
+    jd_text: str = Form(...)
+):
+    """Run the full pipeline, streaming each step's result as a Server-Sent Event."""
+    if not file.filename:
+        raise HTTPException(400, "No file provided")
+    
+    content = await file.read()
+    
+    initial_state: AgentState = {
+        "resume_file": content,
+        "resume_filename": file.filename,
+        "jd_text": jd_text,
+        "parsed_resume": None,
+        "jd_analysis": None,
+        "match_result": None,
+        "improvements": None,
+        "job_results": None,
+        "error": None,
+        "current_step": "started"
+    }
+    
+    async def events():
+        async for event, data in stream_full_analysis(initial_state):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    # Stop reverse proxies from buffering the stream
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+@app.post("/api/candidates")
+async def add_candidate(file: UploadFile = File(...)):
+    """Parse a resume and add it to the recruiter candidate pool."""
+    if not file.filename:
+        raise HTTPException(400, "No file provided")
+    
+    content = await file.read()
+    
+    try:
+        resume = await get_agent('resume_parser').execute(content, file.filename)
+    except Exception as e:
+        raise HTTPException(500, f"Resume parsing failed: {str(e)}")
+    
+    store = get_candidate_store()
+    [candidate_id] = await asyncio.to_thread(store.add, [resume])
+    
+    return {"id": candidate_id, "candidates": len(store)}
+
+@app.post("/api/candidates/rank")
+async def rank_candidate_pool(
+    request: CandidateRankRequest,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Rank stored candidates against a job description."""
+    if not request.jd_text.strip():
+        raise HTTPException(400, "Job description text is required")
+    
+    if background:
+        return enqueue("rank_candidates", run_rank_candidates, request.jd_text, request.top_k, idempotency_key=idempotency_key)
+    return await run_rank_candidates(request.jd_text, request.top_k)
+
+async def run_rank_candidates(jd_text: str, top_k: int) -> dict:
+    jd = await get_agent('jd_analyzer').execute(jd_text)
+    results = await rank_candidates(jd, top_k)
+    
+    return {"jd_analysis": jd.model_dump(), "candidates": results}
+
 @app.post("/api/jobs/search")
-async def search_jobs(file: UploadFile = File(...)):
+async def search_jobs(
+    file: UploadFile = File(...),
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
     """Search for jobs matching the resume."""
     if not file.filename:
         raise HTTPException(400, "No file provided")
     
     content = await file.read()
     
+    if background:
+        return enqueue("search_jobs", run_search_jobs, content, file.filename, idempotency_key=idempotency_key)
+    return await run_search_jobs(content, file.filename)
+
+async def run_search_jobs(content: bytes, filename: str) -> dict:
     initial_state: AgentState = {
         "resume_file": content,
-        "resume_filename": file.filename,
+        "resume_filename": filename,
         "jd_text": None,
         "parsed_resume": None,
         "jd_analysis": None,
@@ -196,19 +401,16 @@ async def search_jobs(file: UploadFile = File(...)):
         raise HTTPException(500, result["error"])
     
     jobs = result["job_results"]
-    formatted = await get_ui_formatter().execute(jobs.model_dump(), "jobs")
+    formatted = await get_agent('ui_formatter').execute(jobs.model_dump(), "jobs")
     
     return formatted.model_dump()
 
 @app.post("/api/jobs/search-from-parsed")
 async def search_jobs_from_parsed(resume: dict):
     """Search for jobs using already parsed resume data."""
-    from agents import JobSearchAgent
-    
     parsed = ParsedResume(**resume)
-    searcher = JobSearchAgent()
-    jobs = await searcher.execute(parsed)
-    formatted = await get_ui_formatter().execute(jobs.model_dump(), "jobs")
+    jobs = await get_agent('job_searcher').execute(parsed)
+    formatted = await get_agent('ui_formatter').execute(jobs.model_dump(), "jobs")
     
     return formatted.model_dump()
 
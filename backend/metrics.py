@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+import asyncio
+import threading
+import time
+
+# Minimal in-process metrics rendered in the Prometheus text format.
+# Recording is a dict lookup plus an add under a lock, so instrumented hot
+# paths pay well under a few microseconds per event and nothing needs a
+# collector running; /metrics is scraped on demand.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_metrics: list["_Metric"] = []
+_collectors: list[Callable[[], Iterable[tuple[str, str, dict, float]]]] = []
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        pass
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *label_values, value: float):
+        with self._lock:
+            self._values[label_values] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (non-cumulative, last is +Inf), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, *label_values, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *label_values) -> int:
+        series = self._values.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+def register_collector(collect: Callable[[], Iterable[tuple[str, str, dict, float]]]):
+    """Add a callback yielding ``(name, help, labels, value)`` gauges computed at scrape time."""
+    _collectors.append(collect)
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    described = set()
+    for collect in _collectors:
+        for name, help, labels, value in collect():
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            names = tuple(labels)
+            lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {value}")
+    return "\n".join(lines) + "\n"
+
+class timer:
+    """Context manager observing elapsed seconds into a histogram."""
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram: Histogram, *label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(*self.label_values, value=time.perf_counter() - self.start)
+
+NODE_LATENCY = Histogram("resumex_node_duration_seconds", "LangGraph node latency", ("node",))
+NODE_ERRORS = Counter("resumex_node_errors_total", "LangGraph nodes that set an error", ("node",))
+LLM_CALLS = Counter("resumex_llm_calls_total", "LLM API calls", ("agent", "model"))
+LLM_PROMPT_TOKENS = Counter("resumex_llm_prompt_tokens_total", "Prompt tokens sent", ("agent", "model"))
+LLM_COMPLETION_TOKENS = Counter("resumex_llm_completion_tokens_total", "Completion tokens received", ("agent", "model"))
+LLM_LATENCY = Histogram("resumex_llm_duration_seconds", "LLM call latency including retries", ("agent", "model"))
+JOB_SOURCE_LATENCY = Histogram("resumex_job_source_duration_seconds", "Job board request latency", ("source",))
+JOB_SOURCE_ERRORS = Counter("resumex_job_source_errors_total", "Failed job board requests", ("source", "reason"))
+EMBEDDING_BATCH_SIZE = Histogram("resumex_embedding_batch_size", "Texts per embedding batch", ("caller",), SIZE_BUCKETS)
+EMBEDDING_LATENCY = Histogram("resumex_embedding_duration_seconds", "Embedding batch latency", ("caller",))
+LOOP_LAG = Histogram("resumex_event_loop_lag_seconds", "Event loop scheduling delay", buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """Sample how late the event loop wakes a sleeping task; runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(value=max(0.0, loop.time() - start - interval))
@@ -2,12 +2,17 @@ from .graph import (
     get_full_analysis_graph,
     get_resume_only_graph,
     get_job_search_graph,
+    stream_full_analysis,
     AgentState
 )
+from .batch import run_match_batch, rank_candidates
 
 __all__ = [
     "get_full_analysis_graph",
     "get_resume_only_graph",
     "get_job_search_graph",
+    "stream_full_analysis",
+    "run_match_batch",
+    "rank_candidates",
     "AgentState"
 ]
@@ -0,0 +1,85 @@
+from agents.candidates import get_candidate_store
+from agents.governor import Priority, llm_priority
+from agents.registry import get_agents
+from config import get_settings
+from models.schemas import ParsedResume, JDAnalysis
+import asyncio
+
+async def run_match_batch(
+    resume: ParsedResume,
+    jd_texts: list[str],
+    improve_top: int = 0
+) -> list[dict]:
+    """Match one parsed resume against many job descriptions.
+
+    JD analysis and matching run concurrently, at most
+    ``batch_concurrency`` postings at a time. Results are ranked by ATS
+    score; postings that failed go last with their error. Improvements are
+    generated only for the ``improve_top`` best matches.
+    """
+    agents = get_agents()
+    semaphore = asyncio.Semaphore(get_settings().batch_concurrency)
+
+    async def match_one(index: int, jd_text: str) -> dict:
+        result = {"index": index, "jd_analysis": None, "match": None, "improvements": None, "error": None}
+        async with semaphore:
+            try:
+                result["jd_analysis"] = await agents['jd_analyzer'].execute(jd_text)
+            except Exception as e:
+                result["error"] = f"JD analysis failed: {str(e)}"
+                return result
+            try:
+                result["match"] = await agents['matcher'].execute(resume, result["jd_analysis"])
+            except Exception as e:
+                result["error"] = f"Matching failed: {str(e)}"
+        return result
+
+    async def improve_one(result: dict):
+        async with semaphore:
+            try:
+                result["improvements"] = await agents['improver'].execute(
+                    resume, result["jd_analysis"], result["match"]
+                )
+            except Exception as e:
+                result["error"] = f"Improvement suggestions failed: {str(e)}"
+
+    with llm_priority(Priority.BATCH):
+        results = await asyncio.gather(*(match_one(i, text) for i, text in enumerate(jd_texts)))
+    results.sort(key=lambda r: (r["match"] is None, -(r["match"].ats_score if r["match"] else 0), r["index"]))
+
+    top = [r for r in results if r["match"] is not None][:max(0, improve_top)]
+    with llm_priority(Priority.BATCH):
+        await asyncio.gather(*(improve_one(r) for r in top))
+
+    return [
+        {key: value.model_dump() if hasattr(value, "model_dump") else value for key, value in r.items()}
+        for r in results
+    ]
+
+async def rank_candidates(jd: JDAnalysis, top_k: int = 10) -> list[dict]:
+    """Rank the stored candidate pool against a JD, best match first.
+
+    The whole pool is scored locally; only the ``candidate_shortlist``
+    best get a full ``MatchingAgent`` call, and the ``top_k`` of those by
+    ATS score are returned.
+    """
+    settings = get_settings()
+    matcher = get_agents()['matcher']
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    shortlist = await asyncio.to_thread(
+        get_candidate_store().rank, jd, max(top_k, settings.candidate_shortlist)
+    )
+
+    async def match_one(candidate_id: str, resume: ParsedResume, prerank: dict) -> dict:
+        result = {"id": candidate_id, "resume": resume.model_dump(), "prerank": prerank, "match": None, "error": None}
+        async with semaphore:
+            try:
+                result["match"] = (await matcher.execute(resume, jd)).model_dump()
+            except Exception as e:
+                result["error"] = f"Matching failed: {str(e)}"
+        return result
+
+    with llm_priority(Priority.BATCH):
+        results = await asyncio.gather(*(match_one(*candidate) for candidate in shortlist))
+    results.sort(key=lambda r: (r["match"] is None, -(r["match"]["ats_score"] if r["match"] else 0), -r["prerank"]["score"]))
+    return results[:top_k]
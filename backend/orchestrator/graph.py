@@ -1,6 +1,38 @@
-from typing import TypedDict, Annotated, Literal
-from langgraph.graph import StateGraph, END
+from typing import TYPE_CHECKING, TypedDict, Annotated, Literal, AsyncIterator
 from models.schemas import ParsedResume, JDAnalysis, MatchResult, ImprovementSuggestions, JobSearchResult
+from agents.registry import get_agents
+from metrics import NODE_ERRORS, NODE_LATENCY
+import functools
+import time
+
+# langgraph is the largest import in the service; graphs are built on first use
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph import StateGraph
+
+def _keep_first_error(current: str | None, update: str | None) -> str | None:
+    # The first failure is the root cause; later nodes only see its fallout
+    return current or update
+
+def _latest_step(current: str, update: str) -> str:
+    return update
+
+def timed_node(node):
+    """Record a node's latency, and count it as failed when it reports an error."""
+    name = node.__name__
+
+    # functools.wraps keeps the node's signature, so langgraph injects config only where it is declared
+    @functools.wraps(node)
+    async def wrapper(state, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await node(state, **kwargs)
+        finally:
+            NODE_LATENCY.observe(name, value=time.perf_counter() - start)
+        if result.get("error"):
+            NODE_ERRORS.inc(name)
+        return result
+    return wrapper
 
 class AgentState(TypedDict):
     resume_file: bytes | None
@@ -11,100 +43,92 @@ class AgentState(TypedDict):
     match_result: MatchResult | None
     improvements: ImprovementSuggestions | None
     job_results: JobSearchResult | None
-    error: str | None
-    current_step: str
-
-# Lazy initialization
-_agents = None
-
-def get_agents():
-    global _agents
-    if _agents is None:
-        from agents import (
-            ResumeParserAgent,
-            JDAnalyzerAgent,
-            MatchingAgent,
-            ImprovementAgent,
-            JobSearchAgent,
-            UIFormatterAgent
-        )
-        _agents = {
-            'resume_parser': ResumeParserAgent(),
-            'jd_analyzer': JDAnalyzerAgent(),
-            'matcher': MatchingAgent(),
-            'improver': ImprovementAgent(),
-            'job_searcher': JobSearchAgent(),
-            'ui_formatter': UIFormatterAgent(),
-        }
-    return _agents
+    error: Annotated[str | None, _keep_first_error]
+    current_step: Annotated[str, _latest_step]
 
-async def parse_resume_node(state: AgentState) -> AgentState:
+@timed_node
+async def parse_resume_node(state: AgentState) -> dict:
     try:
         agents = get_agents()
         parsed = await agents['resume_parser'].execute(
             state["resume_file"],
             state["resume_filename"]
         )
-        state["parsed_resume"] = parsed
-        state["current_step"] = "resume_parsed"
+        return {"parsed_resume": parsed, "current_step": "resume_parsed"}
     except Exception as e:
-        state["error"] = f"Resume parsing failed: {str(e)}"
-    return state
+        return {"error": f"Resume parsing failed: {str(e)}"}
 
-async def analyze_jd_node(state: AgentState) -> AgentState:
+@timed_node
+async def analyze_jd_node(state: AgentState) -> dict:
     try:
         agents = get_agents()
         analysis = await agents['jd_analyzer'].execute(state["jd_text"])
-        state["jd_analysis"] = analysis
-        state["current_step"] = "jd_analyzed"
+        return {"jd_analysis": analysis, "current_step": "jd_analyzed"}
     except Exception as e:
-        state["error"] = f"JD analysis failed: {str(e)}"
-    return state
+        return {"error": f"JD analysis failed: {str(e)}"}
 
-async def match_node(state: AgentState) -> AgentState:
+@timed_node
+async def match_node(state: AgentState) -> dict:
+    if state.get("error"):
+        return {}
     try:
         agents = get_agents()
         match = await agents['matcher'].execute(
             state["parsed_resume"],
             state["jd_analysis"]
         )
-        state["match_result"] = match
-        state["current_step"] = "matched"
+        return {"match_result": match, "current_step": "matched"}
     except Exception as e:
-        state["error"] = f"Matching failed: {str(e)}"
-    return state
+        return {"error": f"Matching failed: {str(e)}"}
 
-async def improve_node(state: AgentState) -> AgentState:
+@timed_node
+async def improve_node(state: AgentState, config: "RunnableConfig") -> dict:
+    if state.get("error"):
+        return {}
+    from langgraph.config import get_stream_writer
+    
     try:
         agents = get_agents()
+        # Only stream_full_analysis consumes suggestions one by one; other runs
+        # keep the non-streamed call and its JSON mode
+        on_improvement = None
+        if config.get("configurable", {}).get("stream_improvements"):
+            writer = get_stream_writer()
+            on_improvement = lambda item: writer({"improvement": item.model_dump()})
         improvements = await agents['improver'].execute(
             state["parsed_resume"],
             state["jd_analysis"],
-            state["match_result"]
+            state["match_result"],
+            on_improvement=on_improvement
         )
-        state["improvements"] = improvements
-        state["current_step"] = "improved"
+        return {"improvements": improvements, "current_step": "improved"}
     except Exception as e:
-        state["error"] = f"Improvement suggestions failed: {str(e)}"
-    return state
+        return {"error": f"Improvement suggestions failed: {str(e)}"}
 
-async def search_jobs_node(state: AgentState) -> AgentState:
+@timed_node
+async def search_jobs_node(state: AgentState) -> dict:
+    if state.get("error"):
+        return {}
     try:
         agents = get_agents()
         jobs = await agents['job_searcher'].execute(state["parsed_resume"])
-        state["job_results"] = jobs
-        state["current_step"] = "jobs_found"
+        return {"job_results": jobs, "current_step": "jobs_found"}
     except Exception as e:
-        state["error"] = f"Job search failed: {str(e)}"
-    return state
+        return {"error": f"Job search failed: {str(e)}"}
 
 def should_continue(state: AgentState) -> Literal["continue", "end"]:
     if state.get("error"):
         return "end"
     return "continue"
 
-def create_full_analysis_graph() -> StateGraph:
-    """Graph for full resume analysis with JD matching."""
+def create_full_analysis_graph() -> "StateGraph":
+    """Graph for full resume analysis with JD matching.
+    
+    Resume parsing and JD analysis are independent, so they fan out from
+    the start and join before matching.
+    """
+    from langgraph.graph import StateGraph, START, END
+    
     workflow = StateGraph(AgentState)
     
     workflow.add_node("parse_resume", parse_resume_node)
@@ -112,24 +136,28 @@ def create_full_analysis_graph() -> StateGraph:
     workflow.add_node("match", match_node)
     workflow.add_node("improve", improve_node)
     
-    workflow.set_entry_point("parse_resume")
-    workflow.add_edge("parse_resume", "analyze_jd")
-    workflow.add_edge("analyze_jd", "match")
+    workflow.add_edge(START, "parse_resume")
+    workflow.add_edge(START, "analyze_jd")
+    workflow.add_edge(["parse_resume", "analyze_jd"], "match")
     workflow.add_edge("match", "improve")
     workflow.add_edge("improve", END)
     
     return workflow.compile()
 
-def create_resume_only_graph() -> StateGraph:
+def create_resume_only_graph() -> "StateGraph":
     """Graph for resume parsing only."""
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     workflow.add_node("parse_resume", parse_resume_node)
     workflow.set_entry_point("parse_resume")
     workflow.add_edge("parse_resume", END)
     return workflow.compile()
 
-def create_job_search_graph() -> StateGraph:
+def create_job_search_graph() -> "StateGraph":
     """Graph for job search based on resume."""
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     workflow.add_node("parse_resume", parse_resume_node)
     workflow.add_node("search_jobs", search_jobs_node)
@@ -155,3 +183,62 @@ def get_job_search_graph():
     if 'job_search' not in _graphs:
         _graphs['job_search'] = create_job_search_graph()
     return _graphs['job_search']
+
+# Node name -> (state key it fills, event name streamed to clients)
+FULL_ANALYSIS_OUTPUTS = {
+    "parse_resume": ("parsed_resume", "parsed_resume"),
+    "analyze_jd": ("jd_analysis", "jd_analysis"),
+    "match": ("match_result", "match_result"),
+    "improve": ("improvements", "improvements"),
+}
+
+async def stream_full_analysis(initial_state: AgentState) -> AsyncIterator[tuple[str, dict]]:
+    """Run the full analysis graph, yielding ``(event, data)`` pairs as nodes start and finish.
+
+    Each node's output is yielded as soon as that node completes, followed
+    by its timing and overall progress; individual suggestions arrive as
+    ``improvement`` events while the improve step is still generating. The
+    stream ends with ``error`` or ``done``.
+    """
+    start = time.perf_counter()
+    started: dict[str, float] = {}
+    total = len(FULL_ANALYSIS_OUTPUTS)
+    completed = 0
+    error = None
+
+    async for mode, task in get_full_analysis_graph().astream(
+        initial_state,
+        {"configurable": {"stream_improvements": True}},
+        stream_mode=["tasks", "custom"]
+    ):
+        if mode == "custom":
+            for event, data in task.items():
+                yield event, data
+            continue
+        name = task["name"]
+        if name not in FULL_ANALYSIS_OUTPUTS:
+            continue
+        now = time.perf_counter()
+        if "result" not in task:
+            started[task["id"]] = now
+            yield "progress", {"step": name, "status": "started", "completed": completed, "total": total}
+            continue
+
+        result = task["result"] or {}
+        key, event = FULL_ANALYSIS_OUTPUTS[name]
+        if result.get(key) is not None:
+            yield event, result[key].model_dump()
+        error = error or result.get("error")
+        completed += 1
+        yield "timing", {
+            "step": name,
+            "duration": round(now - started.pop(task["id"], start), 4),
+            "elapsed": round(now - start, 4)
+        }
+        yield "progress", {"step": name, "status": "finished", "completed": completed, "total": total}
+
+    elapsed = round(time.perf_counter() - start, 4)
+    if error:
+        yield "error", {"error": error, "elapsed": elapsed}
+    else:
+        yield "done", {"elapsed": elapsed}
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from config import get_settings
+from agents.governor import Priority, llm_priority
+import asyncio
+import math
+import time
+import uuid
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Task queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+@dataclass
+class Task:
+    id: str
+    kind: str
+    status: str = "queued"  # queued, running, succeeded, failed
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+class TaskQueue:
+    """In-process queue that runs long analyses on a fixed pool of asyncio workers.
+
+    At most ``max_depth`` tasks wait at once; beyond that ``submit`` raises
+    ``QueueFull`` with a retry estimate from recent task durations.
+    Finished tasks are kept for ``result_ttl`` seconds. Submitting again
+    with the same idempotency key returns the existing task instead of
+    repeating the work.
+    """
+
+    def __init__(self, workers: int = 4, max_depth: int = 100, result_ttl: float = 3600):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._tasks: dict[str, Task] = {}
+        self._keys: dict[str, str] = {}
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+        self._avg_duration = 10.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        idempotency_key: str | None = None
+    ) -> Task:
+        self._ensure_started()
+        self._purge()
+        if idempotency_key and self._keys.get(idempotency_key) in self._tasks:
+            return self._tasks[self._keys[idempotency_key]]
+
+        task = Task(id=uuid.uuid4().hex, kind=kind)
+        try:
+            self._queue.put_nowait((task, fn, args))
+        except asyncio.QueueFull:
+            raise QueueFull(self.retry_after())
+        self._tasks[task.id] = task
+        if idempotency_key:
+            self._keys[idempotency_key] = task.id
+        return task
+
+    def get(self, task_id: str) -> Task | None:
+        self._purge()
+        return self._tasks.get(task_id)
+
+    def retry_after(self) -> int:
+        # Time for the workers to drain what is already queued
+        return max(1, math.ceil(self.depth * self._avg_duration / max(1, self.workers)))
+
+    async def shutdown(self):
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+        self._loop = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or the previous event loop is gone
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._workers = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def _work(self):
+        while True:
+            task, fn, args = await self._queue.get()
+            task.status = "running"
+            task.started_at = time.time()
+            try:
+                # Queued work yields the LLM to interactive requests
+                with llm_priority(Priority.BATCH):
+                    task.result = await fn(*args)
+                task.status = "succeeded"
+            except asyncio.CancelledError:
+                task.status, task.error = "failed", "Cancelled at shutdown"
+                raise
+            except Exception as e:
+                task.status, task.error = "failed", getattr(e, "detail", None) or str(e)
+            finally:
+                task.finished_at = time.time()
+                duration = task.finished_at - task.started_at
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                self._queue.task_done()
+
+    def _purge(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [i for i, t in self._tasks.items() if t.finished_at is not None and t.finished_at < cutoff]
+        for task_id in expired:
+            del self._tasks[task_id]
+        if expired:
+            self._keys = {k: i for k, i in self._keys.items() if i in self._tasks}
+
+_task_queue: TaskQueue | None = None
+
+def get_task_queue() -> TaskQueue:
+    global _task_queue
+    if _task_queue is None:
+        settings = get_settings()
+        _task_queue = TaskQueue(
+            workers=settings.task_workers,
+            max_depth=settings.task_queue_depth,
+            result_ttl=settings.task_result_ttl
+        )
+    return _task_queue
+
+async def shutdown_task_queue():
+    global _task_queue
+    if _task_queue is not None:
+        await _task_queue.shutdown()
+        _task_queue = None
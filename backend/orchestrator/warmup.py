@@ -0,0 +1,101 @@
+from typing import Awaitable, Callable
+from agents.base import get_llm_client
+from agents.extraction import get_extraction_pool, preload_extractors
+from agents.job_sources import get_http_client
+from agents.registry import get_agents, get_embedder
+from config import get_settings
+from .graph import get_full_analysis_graph, get_resume_only_graph, get_job_search_graph
+import asyncio
+import time
+
+class Readiness:
+    """Startup state behind /ready.
+
+    The service is ready once warm-up has finished and every required step
+    succeeded. Optional steps, such as pinging external APIs, are reported
+    but never hold readiness back.
+    """
+
+    def __init__(self):
+        self.finished = False
+        self.steps: dict[str, dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(step["ok"] or not step["required"] for step in self.steps.values())
+
+    def to_dict(self) -> dict:
+        return {"ready": self.ready, "warming_up": not self.finished, "steps": self.steps}
+
+_readiness = Readiness()
+
+def get_readiness() -> Readiness:
+    return _readiness
+
+def _compile_graphs():
+    get_agents()
+    get_full_analysis_graph()
+    get_resume_only_graph()
+    get_job_search_graph()
+
+def _run_embedder():
+    get_embedder().encode(["warm-up"], normalize_embeddings=True)
+
+async def _warm_extraction_pool():
+    # One call per worker so each spawned process pays its imports now
+    pool = get_extraction_pool()
+    await asyncio.gather(*(pool.run(preload_extractors) for _ in range(pool.workers)))
+
+async def _create_clients():
+    get_http_client()
+    get_llm_client()
+
+async def _ping_llm():
+    await get_llm_client().models.list()
+
+async def warm_up(readiness: Readiness | None = None) -> Readiness:
+    """Compile all graphs, load and test-run the embedder, start extraction workers and create the HTTP clients.
+
+    Creating a client opens no sockets; only the optional llm_connection
+    step makes a request, so job board connections open on first search.
+    """
+    settings = get_settings()
+    readiness = readiness or _readiness
+    steps: dict[str, tuple[Callable[[], Awaitable], bool]] = {
+        "graphs": (lambda: asyncio.to_thread(_compile_graphs), True),
+        "extraction_pool": (_warm_extraction_pool, True),
+        "clients": (_create_clients, True)
+    }
+    if settings.warmup_embedder:
+        steps["embedder"] = (lambda: asyncio.to_thread(_run_embedder), True)
+    if settings.warmup_llm_connection and settings.groq_api_key:
+        # Opens the TLS connection early; an unreachable API should not fail the probe
+        steps["llm_connection"] = (_ping_llm, False)
+
+    async def run(name: str, step: Callable[[], Awaitable], required: bool):
+        start = time.perf_counter()
+        try:
+            await step()
+            readiness.steps[name] = {"ok": True, "required": required, "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            readiness.steps[name] = {"ok": False, "required": required, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(run(name, step, required) for name, (step, required) in steps.items())),
+            settings.warmup_timeout
+        )
+    except asyncio.TimeoutError:
+        for name, (_, required) in steps.items():
+            readiness.steps.setdefault(name, {
+                "ok": False, "required": required, "seconds": settings.warmup_timeout, "error": "Timed out"
+            })
+    readiness.finished = True
+    return readiness
+
+def start_warm_up() -> asyncio.Task | None:
+    """Begin warm-up in the background, or report ready straight away when it is disabled."""
+    if not get_settings().warmup_enabled:
+        _readiness.finished = True
+        return None
+    return asyncio.create_task(warm_up())
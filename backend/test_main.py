@@ -0,0 +1,1113 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+import agents.base
+import agents.cache
+import agents.governor
+import agents.job_index
+import agents.resume_parser
+from agents.cache import LRUCache, LLMCachePolicy
+from agents.job_sources import JobSource
+from config import get_settings
+from models.schemas import JobPosting, ParsedResume
+from main import app
+
+JD_JSON = json.dumps({
+    "title": "Backend Engineer",
+    "required_skills": ["Python", "FastAPI"],
+    "ats_keywords": ["python", "api"]
+})
+
+# One payload that validates as every agent's output schema
+PIPELINE_JSON = json.dumps({
+    "name": "Jane Doe",
+    "skills": {"languages": ["Python"]},
+    "title": "Backend Engineer",
+    "required_skills": ["Python", "FastAPI"],
+    "ats_score": 72,
+    "skill_overlap_percent": 50.0,
+    "keyword_coverage": 60.0,
+    "improvements": []
+})
+
+class FakeStream:
+    """Streamed reply sent in small chunks, as Groq does with stream=True."""
+
+    def __init__(self, content: str, chunk_size: int = 8, chunk_delay: float = 0.0):
+        self.chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        self.chunk_delay = chunk_delay
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for text in self.chunks:
+            if self.closed:
+                return
+            await asyncio.sleep(self.chunk_delay)
+            self.sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeCompletions:
+    """Stand-in for the Groq chat-completions API with fixed latency."""
+
+    def __init__(self, content: str | list[str], latency: float = 0.2, chunk_delay: float = 0.0):
+        # A list of replies is served one per call
+        self.content = content
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.prompts = []
+        self.max_tokens = []
+        self.streams = []
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.requests.append(kwargs)
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        self.max_tokens.append(kwargs["max_tokens"])
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        content = self.content.pop(0) if isinstance(self.content, list) else self.content
+        if kwargs.get("stream"):
+            self.streams.append(FakeStream(content, chunk_delay=self.chunk_delay))
+            return self.streams[-1]
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(agents.resume_parser, "_caches", {})
+    monkeypatch.setattr(agents.cache, "_llm_cache", None)
+    monkeypatch.setattr(agents.job_index, "_job_index", None)
+    monkeypatch.setattr(agents.governor, "_governor", None)
+
+def install_fake_llm(monkeypatch, content: str | list[str], latency: float = 0.2, chunk_delay: float = 0.0) -> FakeCompletions:
+    completions = FakeCompletions(content, latency, chunk_delay)
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(agents.base, "_llm_client", fake_client)
+    return completions
+
+def test_agents_share_one_llm_client(monkeypatch):
+    from agents import ResumeParserAgent, JDAnalyzerAgent, MatchingAgent, ImprovementAgent
+
+    install_fake_llm(monkeypatch, JD_JSON)
+    clients = {id(cls().client) for cls in (ResumeParserAgent, JDAnalyzerAgent, MatchingAgent, ImprovementAgent)}
+    assert len(clients) == 1
+
+def test_concurrent_requests_overlap_on_one_worker(monkeypatch):
+    latency = 0.2
+    concurrency = 20
+    completions = install_fake_llm(monkeypatch, JD_JSON, latency)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/api/jd/analyze", json={"jd_text": f"Posting {i}"})
+                for i in range(concurrency)
+            ])
+            return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert completions.calls == concurrency
+    assert completions.peak_in_flight == concurrency
+    # Serialised calls would take concurrency * latency (4 s)
+    assert elapsed < latency * concurrency / 4
+
+def test_full_analysis_parses_resume_and_jd_in_parallel(monkeypatch):
+    from orchestrator import get_full_analysis_graph
+
+    latency = 0.2
+    completions = install_fake_llm(monkeypatch, PIPELINE_JSON, latency)
+    # Graphs compile on first use (or during warm-up); keep that out of the timing
+    get_full_analysis_graph()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/analyze/full",
+                files={"file": ("resume.txt", b"Jane Doe\nPython developer", "text/plain")},
+                data={"jd_text": "Backend Engineer, Python"}
+            )
+            return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(run())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resume"]["name"] == "Jane Doe"
+    assert body["jd_analysis"]["title"] == "Backend Engineer"
+    assert body["match"]["matched_skills"] == ["Python"]
+    assert body["match"]["skill_overlap_percent"] == 50.0
+    assert completions.calls == 4
+    assert completions.peak_in_flight == 2
+    # Nothing consumes suggestions one by one here, so every call keeps JSON mode
+    assert all(r["response_format"] == {"type": "json_object"} and not r.get("stream") for r in completions.requests)
+    # parse + analyze overlap, so the critical path is three round trips
+    assert elapsed < latency * 3.5
+
+def test_lru_cache_evicts_by_size_and_persists_to_disk(tmp_path):
+    cache = LRUCache(max_bytes=10, disk_dir=tmp_path, namespace="t")
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    assert cache.get("a") == "12345"
+    cache.set("c", "12345")  # evicts "b", the least recently used
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 10
+
+    restarted = LRUCache(max_bytes=10, disk_dir=tmp_path, namespace="t")
+    assert restarted.get("b") == "12345"
+    assert restarted.get("missing") is None
+    stats = restarted.stats()
+    assert (stats["hits"], stats["disk_hits"], stats["misses"]) == (0, 1, 1)
+
+def test_resume_parser_reuses_cached_result(monkeypatch):
+    from agents import ResumeParserAgent
+
+    completions = install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0)
+    parser = ResumeParserAgent()
+
+    async def run():
+        first = await parser.execute(b"Jane Doe\nPython developer", "resume.txt")
+        second = await parser.execute(b"Jane Doe\nPython developer", "resume.txt")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert completions.calls == 1
+    caches = agents.resume_parser.get_resume_caches()
+    assert caches["parsed_resume"].stats()["hits"] == 1
+    assert caches["resume_text"].stats()["misses"] == 1
+    # Text extracted under other limits is not reused
+    monkeypatch.setattr(parser.settings, "extraction_max_chars", 8)
+    asyncio.run(parser.execute(b"Jane Doe\nPython developer", "resume.txt"))
+    assert caches["resume_text"].stats()["misses"] == 2
+    assert completions.calls == 2
+
+def test_llm_response_cache_follows_agent_policy(monkeypatch):
+    from agents import JDAnalyzerAgent
+
+    completions = install_fake_llm(monkeypatch, JD_JSON, latency=0)
+    analyzer = JDAnalyzerAgent()
+
+    async def analyze_twice():
+        await analyzer.execute("Backend Engineer, Python")
+        await analyzer.execute("Backend Engineer, Python")
+
+    asyncio.run(analyze_twice())
+    assert completions.calls == 1
+
+    # Above the policy's temperature ceiling every call goes to the model
+    monkeypatch.setattr(JDAnalyzerAgent, "cache_policy", LLMCachePolicy(max_temperature=0.1))
+    asyncio.run(analyze_twice())
+    assert completions.calls == 3
+
+def test_llm_cache_keeps_only_complete_valid_replies(monkeypatch):
+    from agents import ImprovementAgent, JDAnalyzerAgent
+    from models.schemas import JDAnalysis, MatchResult
+
+    # The first reply fails validation and is re-asked
+    completions = install_fake_llm(monkeypatch, ['{"required_skills": "Python"}', JD_JSON, JD_JSON], latency=0)
+    analyzer = JDAnalyzerAgent()
+    for _ in range(3):
+        asyncio.run(analyzer.execute("Backend Engineer, Python"))
+    assert completions.calls == 3
+
+    # A streamed reply cut off before its object closes is used but not cached
+    suggestion = {"section": "skills", "original": "", "suggested": "Add Go", "reason": "Required", "severity": "high"}
+    reply = json.dumps({"improvements": [suggestion], "missing_keywords": ["Go"]})
+    completions = install_fake_llm(monkeypatch, [reply[:-30], reply, reply], latency=0)
+    improver = ImprovementAgent()
+    match = MatchResult(ats_score=50, skill_overlap_percent=50.0, keyword_coverage=0.0)
+
+    async def improve():
+        return await improver.execute(ParsedResume(name="Jane Doe"), JDAnalysis(), match, on_improvement=lambda item: None)
+
+    for _ in range(3):
+        assert asyncio.run(improve()).improvements[0].suggested == "Add Go"
+    assert completions.calls == 2
+    assert [stream.closed for stream in completions.streams] == [True, True]
+
+class FakeEmbedder:
+    """Deterministic bag-of-characters embedder standing in for SentenceTransformer."""
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        vectors = np.zeros((len(texts), 26), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for ch in text.lower():
+                if "a" <= ch <= "z":
+                    vectors[row, ord(ch) - ord("a")] += 1
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+class SlowSource(JobSource):
+    def __init__(self, name: str, latency: float, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+
+    async def search(self, client, query, settings):
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise httpx.ConnectTimeout("timed out")
+        return [JobPosting(title=f"{query} engineer", company=self.name, location="Remote", url=f"https://{self.name}", source=self.name)]
+
+def test_job_sources_are_queried_concurrently():
+    from agents import JobSearchAgent
+
+    latency = 0.2
+    searcher = JobSearchAgent()
+    searcher._embedder = FakeEmbedder()
+    searcher.sources = [SlowSource("a", latency), SlowSource("b", latency), SlowSource("c", latency, fail=True)]
+    resume = ParsedResume(skills={"languages": ["Python"]})
+
+    start = time.perf_counter()
+    result = asyncio.run(searcher.execute(resume))
+    elapsed = time.perf_counter() - start
+
+    assert {job.source for job in result.jobs} == {"a", "b"}
+    assert elapsed < latency * 2
+
+def test_rank_jobs_embeds_in_one_batch_and_returns_top_k():
+    from agents import JobSearchAgent
+
+    class CountingEmbedder(FakeEmbedder):
+        calls = 0
+
+        def encode(self, texts, **kwargs):
+            self.calls += 1
+            return super().encode(texts, **kwargs)
+
+    searcher = JobSearchAgent()
+    searcher._embedder = CountingEmbedder()
+    resume = ParsedResume(summary="python", skills={"languages": ["python"]})
+    jobs = [
+        JobPosting(title=title, company="c", location="l", url=title)
+        for title in ["zzzz", "python", "pythons", "java", "kotlin"]
+    ]
+
+    ranked = searcher._rank_jobs(jobs, resume, top_k=2)
+
+    assert searcher._embedder.calls == 1
+    assert [job.title for job in ranked] == ["python", "pythons"]
+    assert ranked[0].match_score > ranked[1].match_score > jobs[0].match_score
+
+def test_registry_loads_each_model_once_across_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import agents.registry as registry
+
+    monkeypatch.setattr(registry, "_models", {})
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.05)
+        return np.zeros(1024, dtype=np.float32)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: registry.get_model("test-model", loader), range(8)))
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+    assert registry.model_memory()["test-model"] == 4096
+    assert registry.get_agent("job_searcher") is registry.get_agents()["job_searcher"]
+
+def test_embedding_store_shares_appends_and_evicts_oldest(tmp_path):
+    from agents.vector_store import EmbeddingStore
+
+    writer = EmbeddingStore(tmp_path, max_bytes=4 * 4 * 10)  # ten 4-dim float32 rows
+    reader = EmbeddingStore(tmp_path)  # e.g. another worker process
+    vectors = np.arange(32, dtype=np.float32).reshape(8, 4)
+
+    writer.put_many([f"k{i}" for i in range(8)], vectors)
+    assert np.array_equal(reader.get_many(["k3"])["k3"], vectors[3])
+
+    writer.put_many(["k0"], vectors[:1] * -1)  # superseded row
+    writer.compact()
+    assert len(reader) == 8
+    assert np.array_equal(reader.get_many(["k0"])["k0"], vectors[0] * -1)
+
+    writer.put_many([f"n{i}" for i in range(4)], vectors[:4])  # outgrows max_bytes
+    remaining = reader.get_many([f"k{i}" for i in range(8)] + [f"n{i}" for i in range(4)])
+    assert len(remaining) == 8
+    assert "k1" not in remaining and "n3" in remaining
+
+def test_rank_jobs_reuses_stored_job_embeddings(tmp_path, monkeypatch):
+    from agents import JobSearchAgent
+    from config import get_settings
+    import agents.vector_store
+
+    monkeypatch.setattr(get_settings(), "job_embedding_dir", str(tmp_path))
+    monkeypatch.setattr(agents.vector_store, "_job_store", None)
+    encoded = []
+
+    class RecordingEmbedder(FakeEmbedder):
+        def encode(self, texts, **kwargs):
+            encoded.append(len(texts))
+            return super().encode(texts, **kwargs)
+
+    searcher = JobSearchAgent()
+    searcher._embedder = RecordingEmbedder()
+    resume = ParsedResume(summary="python")
+    jobs = [JobPosting(title=t, company="c", location="l", url=t) for t in ["python", "java", "go"]]
+
+    first = [job.title for job in searcher._rank_jobs(jobs, resume)]
+    second = [job.title for job in searcher._rank_jobs(jobs, resume)]
+
+    assert first == second
+    assert encoded == [4, 1]
+
+def test_job_index_search_expiry_and_persistence(tmp_path):
+    from agents.job_index import JobIndex, posting_id
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(400, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    jobs = [JobPosting(title=f"job {i}", company="c", location="l", url=f"u{i}") for i in range(400)]
+
+    index = JobIndex(nprobe=4, ttl=60, min_train_size=100)
+    index.add(jobs[:300], vectors[:300], now=0)
+    index.add(jobs[300:], vectors[300:], now=100)
+    assert index.needs_training()
+    index.train()
+
+    hits = index.search(vectors[350], k=3)
+    assert hits[0][0].title == "job 350"
+    assert hits[0][1] == pytest.approx(1.0)
+
+    assert index.expire(now=120) == 300
+    assert index.delete([posting_id(jobs[350])]) == 1
+    assert len(index) == 99
+
+    index.save(tmp_path)
+    restored = JobIndex.load(tmp_path, nprobe=4)
+    assert len(restored) == 99
+    assert restored.search(vectors[351], k=1)[0][0].title == "job 351"
+
+def test_job_search_answers_from_local_index(monkeypatch):
+    from agents import JobSearchAgent
+    from agents.job_index import get_job_index
+    from config import get_settings
+
+    monkeypatch.setattr(get_settings(), "job_index_min_size", 2)
+    searcher = JobSearchAgent()
+    searcher._embedder = FakeEmbedder()
+    searcher.sources = []
+    corpus = [JobPosting(title=t, company="c", location="l", url=t) for t in ["python", "java"]]
+    index = get_job_index()
+    index.add(corpus, FakeEmbedder().encode(["python", "java"], normalize_embeddings=True))
+
+    result = asyncio.run(searcher.execute(ParsedResume(summary="python"), limit=1))
+
+    assert [job.title for job in result.jobs] == ["python"]
+    assert result.jobs[0].match_score == pytest.approx(100.0, rel=1e-3)
+
+def test_extraction_pool_runs_documents_out_of_process_with_timeout():
+    from agents.extraction import ExtractionPool, extract_text
+    from docx import Document
+    from io import BytesIO
+
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    doc.add_paragraph("Senior Python Engineer")
+    buffer = BytesIO()
+    doc.save(buffer)
+
+    # Spawned workers need a generous timeout for the first document only
+    pool = ExtractionPool(workers=2, timeout=30, max_worker_memory=1)
+
+    async def run():
+        text = await pool.run(extract_text, buffer.getvalue(), "docx")
+        pool.max_worker_memory = 1 << 40
+        # Start both workers so the timing below excludes spawning
+        await asyncio.gather(pool.run(time.sleep, 0.2), pool.run(time.sleep, 0.2))
+        pool.timeout = 2.5
+        hung = asyncio.create_task(pool.run(time.sleep, 10))
+        await asyncio.sleep(2)
+        # Still running when the hung document's pool is terminated; it is resubmitted, not failed
+        neighbour = asyncio.create_task(pool.run(time.sleep, 1))
+        with pytest.raises(ValueError, match="timed out"):
+            await hung
+        await neighbour
+        return text
+
+    try:
+        text = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert text == "Jane Doe\nSenior Python Engineer"
+    # One recycle for exceeding the 1-byte memory limit, one for the timeout
+    assert pool.recycles == 2
+
+def make_pdf(pages: int, two_column_first: bool = False) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        for line in range(12):
+            if two_column_first and number == 0:
+                page.insert_text((50, 80 + line * 20), f"Left {line}")
+                page.insert_text((320, 80 + line * 20), f"Right {line}")
+            else:
+                page.insert_text((50, 80 + line * 20), f"Page {number} line {line} with a long stretch of resume text")
+    return doc.tobytes()
+
+def test_pdf_pages_stream_within_caps_and_escalate_multi_column(monkeypatch):
+    import agents.extraction
+    from agents.extraction import extract_pdf, iter_pdf_pages
+
+    checks = []
+    needs_layout = agents.extraction._needs_layout
+    monkeypatch.setattr(agents.extraction, "_needs_layout", lambda *args: checks.append(1) or needs_layout(*args))
+    content = make_pdf(5, two_column_first=True)
+    pages = iter_pdf_pages(content, max_pages=3)
+
+    first = next(pages)
+    # pdfplumber's layout mode keeps both columns on the same row
+    assert "Left 0" in first and "Right 0" in first.splitlines()[0]
+    # Pages are extracted as they are consumed
+    assert len(checks) == 1
+    rest = list(pages)
+    assert len(rest) == 2 and len(checks) == 3
+    # Each page is judged on its own: single-column pages after it stay on the PyMuPDF path
+    assert rest[0].startswith("Page 1 line 0")
+    assert extract_pdf(content, max_pages=3) == "\n".join([first] + rest)
+    assert sum(len(page) for page in iter_pdf_pages(content, max_chars=150)) == 150
+
+STRUCTURED_RESUME = """Jane Q. Doe
+San Francisco, CA | jane.doe@example.com | (415) 555-0199 | linkedin.com/in/janedoe
+
+Summary
+Backend engineer with 6 years building Python APIs.
+
+Experience
+Senior Software Engineer | Acme Corp | Jan 2021 - Present
+- Led migration of billing services to FastAPI, cutting p95 latency 40%
+Software Engineer, Initech, 06/2018 - 12/2020
+- Built ETL pipelines in Python and
+  Airflow processing 2TB/day
+
+Education
+B.S. in Computer Science | University of California, Berkeley | 2014 - 2018
+GPA: 3.8/4.0
+
+Skills
+Languages: Python, Go, SQL
+Frameworks: FastAPI, Django
+Docker, Kubernetes, Leadership
+"""
+
+def test_preparser_extracts_structured_resume_without_llm(monkeypatch):
+    from agents import ResumeParserAgent
+
+    completions = install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0)
+    parsed = asyncio.run(ResumeParserAgent().execute(STRUCTURED_RESUME.encode(), "resume.txt"))
+
+    assert completions.calls == 0
+    assert (parsed.name, parsed.email, parsed.phone) == ("Jane Q. Doe", "jane.doe@example.com", "(415) 555-0199")
+    assert parsed.linkedin == "linkedin.com/in/janedoe"
+    assert [(e.company, e.end_date) for e in parsed.experience] == [("Acme Corp", "Present"), ("Initech", "12/2020")]
+    assert parsed.experience[1].bullets == ["Built ETL pipelines in Python and Airflow processing 2TB/day"]
+    assert (parsed.education[0].degree, parsed.education[0].field, parsed.education[0].gpa) == ("B.S.", "Computer Science", "3.8/4.0")
+    assert parsed.skills.frameworks == ["FastAPI", "Django"]
+    assert parsed.skills.soft_skills == ["Leadership"]
+
+def test_preparser_sends_only_unresolved_sections_to_llm(monkeypatch):
+    from agents import ResumeParserAgent
+
+    completions = install_fake_llm(monkeypatch, json.dumps({"name": "", "projects": [{"name": "ResumeX"}]}), latency=0)
+    text = STRUCTURED_RESUME + "\nProjects\nResumeX - multi-agent resume analysis with LangGraph\n"
+    parsed = asyncio.run(ResumeParserAgent().execute(text.encode(), "resume.txt"))
+
+    assert completions.calls == 1
+    assert "ResumeX - multi-agent" in completions.prompts[0]
+    assert "jane.doe@example.com" not in completions.prompts[0]
+    assert parsed.name == "Jane Q. Doe"
+    assert parsed.projects[0].name == "ResumeX"
+
+def test_preparser_sends_unknown_sections_after_skills_to_llm(monkeypatch):
+    from agents import ResumeParserAgent
+
+    completions = install_fake_llm(monkeypatch, json.dumps({"name": "", "certifications": ["Dean's List"]}), latency=0)
+    text = STRUCTURED_RESUME + "\nAwards\nDean's List, 2017\nHackathon Winner\n"
+    parsed = asyncio.run(ResumeParserAgent().execute(text.encode(), "resume.txt"))
+
+    assert completions.calls == 1
+    assert "OTHER\nAwards\nDean's List, 2017" in completions.prompts[0]
+    # The award lines no longer leak into the skills
+    assert parsed.skills.tools == ["Docker", "Kubernetes"]
+    assert parsed.certifications == ["Dean's List"]
+
+def test_preparser_ends_experience_at_unknown_heading():
+    from agents.preparser import preparse_resume
+
+    for heading in ("Volunteer Work", "VOLUNTEER WORK"):
+        text = STRUCTURED_RESUME.replace("\nEducation", f"\n{heading}\nMentor at Code Club teaching Python\n\nEducation")
+        pre = preparse_resume(text)
+
+        assert pre.fields["experience"][-1]["bullets"] == ["Built ETL pipelines in Python and Airflow processing 2TB/day"]
+        assert pre.unresolved == ["other"]
+        assert pre.llm_text() == f"OTHER\n{heading}\nMentor at Code Club teaching Python"
+
+def test_match_scores_are_computed_locally(monkeypatch):
+    from agents import MatchingAgent
+    from agents.compact import schema_outline
+    from agents.preparser import preparse_resume
+    from agents.scoring import score_match
+    from models.schemas import JDAnalysis, MatchResult
+
+    resume = ParsedResume(**preparse_resume(STRUCTURED_RESUME).fields)
+    jd = JDAnalysis(
+        required_skills=["Python", "golang", "k8s", "Terraform", "python"],
+        ats_keywords=["ETL pipeline", "billing service", "GraphQL"],
+        experience_years="5+ years"
+    )
+    card = score_match(resume, jd)
+
+    assert card.matched_skills == ["Python", "golang", "k8s"]
+    assert card.missing_skills == ["Terraform"]
+    assert (card.skill_overlap_percent, card.keyword_coverage) == (75.0, 66.7)
+    assert score_match(resume, jd) == card
+    # "Present" runs to the resume's latest year (2021), not today, unless a reference year is given
+    assert card.ats_score == 66 and score_match(resume, jd, as_of=2021) == card
+    assert score_match(resume, jd, as_of=2031).ats_score == 74
+
+    start = time.perf_counter()
+    for _ in range(100):
+        score_match(resume, jd)
+    assert (time.perf_counter() - start) / 100 < 0.001
+
+    llm = json.dumps({"ats_score": 3, "experience_match": "Meets requirements", "strengths": ["Python"]})
+    completions = install_fake_llm(monkeypatch, llm, latency=0)
+    result = asyncio.run(MatchingAgent().execute(resume, jd))
+
+    assert completions.calls == 1
+    assert '"skill_overlap_percent":75.0' in completions.prompts[0]
+    assert schema_outline(MatchResult, {"experience_match", "strengths", "gaps"}) in completions.prompts[0]
+    assert result.ats_score == card.ats_score
+    assert (result.experience_match, result.strengths) == ("Meets requirements", ["Python"])
+
+def test_prompt_inputs_are_compact_and_fit_budget(monkeypatch):
+    from agents import ImprovementAgent
+    from agents.base import get_usage
+    from agents.compact import compact_resume, estimate_tokens
+    from agents.preparser import preparse_resume
+    from config import get_settings
+    from models.schemas import JDAnalysis, MatchResult
+
+    resume = ParsedResume(**preparse_resume(STRUCTURED_RESUME).fields)
+    jd = JDAnalysis(required_skills=["Python", "FastAPI"], ats_keywords=["billing"])
+    full, trimmed = compact_resume(resume, jd)
+
+    assert trimmed == 0
+    assert "jane.doe@example.com" not in full and "Jane Q. Doe" not in full
+    assert "null" not in full and "[]" not in full and ": " not in full
+
+    budget = estimate_tokens(full) - 10
+    fitted, trimmed = compact_resume(resume, jd, budget)
+    assert estimate_tokens(fitted) <= budget
+    # The irrelevant bullet in the oldest role goes before the FastAPI billing one
+    assert trimmed == 1
+    assert "Airflow" not in fitted and "billing services to FastAPI" in fitted
+
+    completions = install_fake_llm(monkeypatch, json.dumps({"improvements": []}), latency=0)
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+    match = MatchResult(ats_score=50, skill_overlap_percent=50.0, keyword_coverage=0.0)
+    asyncio.run(ImprovementAgent().execute(resume, jd, match))
+
+    usage = get_usage()["ImprovementAgent"]
+    assert usage["calls"] >= 1
+    assert usage["input_tokens"] >= estimate_tokens(completions.prompts[-1])
+
+def test_full_analysis_streams_each_step_as_it_finishes(monkeypatch):
+    from orchestrator import stream_full_analysis
+
+    completions = install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0.2)
+    state = {
+        "resume_file": b"Jane Doe\nPython developer",
+        "resume_filename": "resume.txt",
+        "jd_text": "Backend Engineer, Python",
+        "error": None,
+        "current_step": "started"
+    }
+
+    async def run():
+        start = time.perf_counter()
+        return [(event, time.perf_counter() - start, data) async for event, data in stream_full_analysis(state)]
+
+    arrivals = asyncio.run(run())
+    events = {name: (at, data) for name, at, data in arrivals}
+    assert events["parsed_resume"][1]["name"] == "Jane Doe"
+    assert events["match_result"][1]["matched_skills"] == ["Python"]
+    assert "improvements" in events and arrivals[-1][0] == "done"
+    # Parsing is visible long before the last step finishes
+    assert events["parsed_resume"][0] < events["done"][0] - 0.3
+    timings = {data["step"]: data["duration"] for name, _, data in arrivals if name == "timing"}
+    assert set(timings) == {"parse_resume", "analyze_jd", "match", "improve"}
+    assert all(duration >= 0.15 for duration in timings.values())
+    progress = [data for name, _, data in arrivals if name == "progress"]
+    assert progress[-1] == {"step": "improve", "status": "finished", "completed": 4, "total": 4}
+    # Only the improve step streams; its suggestions are forwarded as they arrive
+    assert [bool(r.get("stream")) for r in completions.requests].count(True) == 1
+
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/api/analyze/full/stream",
+                files={"file": ("resume.txt", b"Jane Doe\nPython developer", "text/plain")},
+                data={"jd_text": "Backend Engineer, Python"}
+            )
+
+    response = asyncio.run(request())
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: parsed_resume\ndata: {" in response.text
+    assert response.text.rstrip().split("\n")[-2] == "event: done"
+
+def test_improvements_stream_item_by_item_and_stop_at_object_close(monkeypatch):
+    from agents import ImprovementAgent, JDAnalyzerAgent
+    from models.schemas import JDAnalysis, MatchResult
+
+    suggestion = {"section": "skills", "original": "", "suggested": "Add Terraform", "reason": "Required", "severity": "high"}
+    reply = json.dumps({"improvements": [suggestion, {**suggestion, "suggested": "Add Go"}], "missing_keywords": ["Terraform"]})
+    completions = install_fake_llm(monkeypatch, "```json\n" + reply + "\n```\n" + "Let me know if you need more help! " * 20, latency=0, chunk_delay=0.002)
+
+    arrivals = []
+    async def run():
+        resume = ParsedResume(name="Jane Doe")
+        match = MatchResult(ats_score=50, skill_overlap_percent=50.0, keyword_coverage=0.0)
+        return await ImprovementAgent().execute(
+            resume, JDAnalysis(), match,
+            on_improvement=lambda item: arrivals.append((item.suggested, completions.streams[0].sent))
+        )
+
+    suggestions = asyncio.run(run())
+
+    assert [text for text, _ in arrivals] == ["Add Terraform", "Add Go"]
+    # The first suggestion is delivered well before the reply's JSON is complete
+    object_chunks = len("```json\n" + reply) / 8
+    assert arrivals[0][1] < object_chunks / 2 < arrivals[1][1]
+    assert suggestions.missing_keywords == ["Terraform"]
+    stream = completions.streams[0]
+    # Nothing after the closing brace was read
+    assert stream.closed and stream.sent < len(stream.chunks) / 2
+    # Each agent sizes its completion from its own schema
+    asyncio.run(JDAnalyzerAgent().execute("Backend Engineer"))
+    assert completions.max_tokens[0] > completions.max_tokens[1]
+    assert max(completions.max_tokens) <= 4096
+
+def test_batch_match_parses_once_and_ranks_by_score(monkeypatch):
+    from agents import JDAnalyzerAgent
+    from models.schemas import JDAnalysis
+
+    completions = install_fake_llm(monkeypatch, json.dumps({"improvements": []}), latency=0.1)
+    skills = [["Terraform"], ["Python", "FastAPI"], ["Python", "Rust"]]
+
+    async def analyze(self, jd_text):
+        await asyncio.sleep(0.1)
+        return JDAnalysis(title=jd_text, required_skills=skills[int(jd_text)])
+
+    monkeypatch.setattr(JDAnalyzerAgent, "execute", analyze)
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/match/batch",
+                files={"file": ("resume.txt", STRUCTURED_RESUME.encode(), "text/plain")},
+                data={"jd_texts": ["0", "1", "2"], "improve_top": "1"}
+            )
+            return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(run())
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [1, 2, 0]
+    assert [r["match"]["ats_score"] for r in results] == sorted((r["match"]["ats_score"] for r in results), reverse=True)
+    assert results[0]["improvements"] is not None and results[1]["improvements"] is None
+    # Resume pre-parsed without the LLM; three matcher calls and one improver call
+    assert completions.calls == 4
+    # Postings run concurrently: analyze + match + improve, not three times over
+    assert elapsed < 0.6
+
+def test_candidate_pool_ranks_ten_thousand_and_matches_only_shortlist(monkeypatch, tmp_path):
+    import agents.candidates
+    from agents.candidates import CandidateStore
+    from models.schemas import Experience, JDAnalysis, Skills
+    from orchestrator import rank_candidates
+
+    class RandomEmbedder:
+        def __init__(self):
+            self.rng = np.random.default_rng(0)
+
+        def encode(self, texts, normalize_embeddings=False, **kwargs):
+            vectors = self.rng.standard_normal((len(texts), 64)).astype(np.float32)
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    pool = ["Python", "Go", "Rust", "Java", "Django", "React", "Kafka", "Spark", "SQL", "AWS"]
+    rng = np.random.default_rng(1)
+    resumes = [
+        ParsedResume(
+            summary=f"Engineer {i}",
+            skills=Skills(languages=list(rng.choice(pool, 4, replace=False))),
+            experience=[Experience(company="Acme", title="Engineer", bullets=[f"Shipped feature {i}"])]
+        )
+        for i in range(10_000)
+    ]
+    star = ParsedResume(
+        summary="Platform engineer",
+        skills=Skills(languages=["Python"], tools=["Kubernetes", "Terraform"]),
+        experience=[Experience(company="Initech", title="SRE", bullets=["Ran billing services on k8s"])]
+    )
+    store = CandidateStore(RandomEmbedder(), tmp_path)
+    ids = store.add(resumes + [star])
+    assert len(store) == 10_001 and store.add([star]) == [ids[-1]]
+
+    jd = JDAnalysis(title="SRE", required_skills=["Python", "Kubernetes", "Terraform"], ats_keywords=["billing"])
+    start = time.perf_counter()
+    ranked = store.rank(jd, k=20)
+    assert time.perf_counter() - start < 1.0
+    assert ranked[0][0] == ids[-1]
+    assert ranked[0][2]["skill_overlap_percent"] == 100.0
+
+    # Adds are on disk at once: another worker sees them, and skips a line a crash cut short
+    other = CandidateStore(RandomEmbedder(), tmp_path)
+    assert other.rank(jd, k=1)[0][0] == ids[-1]
+    with open(tmp_path / "candidates.jsonl", "ab") as f:
+        f.write(b'{"id": "half-writ')
+    [late] = other.add([ParsedResume(summary="Late joiner")])
+    assert store.get(late).summary == "Late joiner" and len(store) == len(other) == 10_002
+
+    completions = install_fake_llm(monkeypatch, json.dumps({"strengths": ["Kubernetes"]}), latency=0)
+    monkeypatch.setattr(agents.candidates, "_candidate_store", store)
+    monkeypatch.setattr(get_settings(), "candidate_shortlist", 5)
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+    results = asyncio.run(rank_candidates(jd, top_k=3))
+
+    assert completions.calls == 5
+    assert len(results) == 3 and results[0]["id"] == ids[-1]
+    assert results[0]["match"]["matched_skills"] == ["Python", "Kubernetes", "Terraform"]
+
+def test_background_analysis_returns_job_id_and_applies_backpressure(monkeypatch):
+    import orchestrator.task_queue
+    from orchestrator.task_queue import TaskQueue
+
+    install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0.1)
+    monkeypatch.setattr(orchestrator.task_queue, "_task_queue", TaskQueue(workers=1, max_depth=1, result_ttl=60))
+
+    def submit(client, key=None):
+        return client.post(
+            "/api/analyze/full?background=true",
+            files={"file": ("resume.txt", b"Jane Doe\nPython developer", "text/plain")},
+            data={"jd_text": "Backend Engineer, Python"},
+            headers={"Idempotency-Key": key} if key else {}
+        )
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await submit(client, key="abc")
+            retried = await submit(client, key="abc")
+            await asyncio.sleep(0.01)  # the worker picks up the first task
+            queued = await submit(client)
+            rejected = await submit(client)
+            while (status := (await client.get(first.json()["status_url"])).json())["status"] in ("queued", "running"):
+                await asyncio.sleep(0.05)
+            missing = await client.get("/api/jobs/nope")
+            await orchestrator.task_queue.shutdown_task_queue()
+            return first, retried, queued, rejected, status, missing
+
+    first, retried, queued, rejected, status, missing = asyncio.run(run())
+
+    assert first.status_code == 202 and queued.status_code == 202
+    assert retried.json()["id"] == first.json()["id"]
+    assert rejected.status_code == 429 and int(rejected.headers["Retry-After"]) >= 1
+    assert status["status"] == "succeeded"
+    assert status["result"]["resume"]["name"] == "Jane Doe"
+    assert missing.status_code == 404
+
+def test_long_llm_routes_accept_background(monkeypatch):
+    import agents.candidates
+    import orchestrator.task_queue
+    from agents.candidates import CandidateStore
+    from orchestrator.task_queue import TaskQueue
+
+    install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0.1)
+    monkeypatch.setattr(orchestrator.task_queue, "_task_queue", TaskQueue(workers=2, max_depth=4, result_ttl=60))
+    monkeypatch.setattr(agents.candidates, "_candidate_store", CandidateStore(FakeEmbedder()))
+    resume = {"name": "Jane Doe", "skills": {"languages": ["Python"]}}
+    jd = {"title": "Backend Engineer", "required_skills": ["Python", "Go"]}
+    match = {"ats_score": 50, "skill_overlap_percent": 50.0, "keyword_coverage": 0.0}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            accepted = [
+                await client.post("/api/improve?background=true", json={"resume": resume, "jd": jd, "match": match}),
+                await client.post("/api/candidates/rank?background=true", json={"jd_text": "Backend Engineer, Python"})
+            ]
+            statuses = []
+            for response in accepted:
+                while (status := (await client.get(response.json()["status_url"])).json())["status"] in ("queued", "running"):
+                    await asyncio.sleep(0.05)
+                statuses.append(status)
+            await orchestrator.task_queue.shutdown_task_queue()
+            return accepted, statuses
+
+    accepted, statuses = asyncio.run(run())
+
+    assert [response.status_code for response in accepted] == [202, 202]
+    assert [status["status"] for status in statuses] == ["succeeded", "succeeded"]
+    assert statuses[1]["result"]["candidates"] == []
+
+def test_llm_governor_orders_by_priority_and_honours_limits():
+    import groq
+    from agents.governor import LLMGovernor, Priority, llm_priority
+
+    async def priorities():
+        governor = LLMGovernor(max_concurrency=1)
+        order = []
+
+        async def call(name, priority, delay=0.05):
+            async def work():
+                order.append(name)
+                await asyncio.sleep(delay)
+            with llm_priority(priority):
+                await governor.run("m", 10, work)
+
+        holder = asyncio.create_task(call("holder", Priority.BATCH))
+        await asyncio.sleep(0.01)
+        batch = [asyncio.create_task(call(f"batch{i}", Priority.BATCH)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(call("interactive", Priority.INTERACTIVE))
+        await asyncio.gather(holder, interactive, *batch)
+        return order
+
+    assert asyncio.run(priorities()) == ["holder", "interactive", "batch0", "batch1"]
+
+    async def limits():
+        governor = LLMGovernor(tpm=6000, base_delay=0.01)
+        calls = 0
+
+        async def flaky():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                response = httpx.Response(429, headers={"retry-after": "0.2"}, request=httpx.Request("POST", "http://groq"))
+                raise groq.RateLimitError("rate limited", response=response, body=None)
+            return "ok"
+
+        start = time.perf_counter()
+        assert await governor.run("m", 100, flaky) == "ok"
+        retried = time.perf_counter() - start
+
+        # A 6000-token reservation empties the bucket; 50 more refill at 100/s
+        await governor.run("n", 6000, lambda: asyncio.sleep(0))
+        start = time.perf_counter()
+        await governor.run("n", 50, lambda: asyncio.sleep(0))
+        return calls, governor.retries, retried, time.perf_counter() - start
+
+    calls, retries, retried, throttled = asyncio.run(limits())
+    assert (calls, retries) == (2, 1)
+    assert retried >= 0.2
+    assert 0.3 < throttled < 1.0
+
+def test_llm_output_is_repaired_locally_and_only_invalid_fields_reasked(monkeypatch):
+    from agents import ImprovementAgent, JDAnalyzerAgent
+    from agents.base import get_usage
+    from agents.compact import schema_outline
+    from models.schemas import JDAnalysis, MatchResult
+
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+    # Trailing commas and a reply cut off mid-value need no second call
+    completions = install_fake_llm(monkeypatch, '{"title": "SRE", "required_skills": ["Go", "Python",], "ats_keywords": ["on-ca', latency=0)
+    jd = asyncio.run(JDAnalyzerAgent().execute("SRE role"))
+
+    assert (jd.title, jd.required_skills, jd.ats_keywords) == ("SRE", ["Go", "Python"], ["on-ca"])
+    assert completions.calls == 1
+    assert completions.requests[0]["response_format"] == {"type": "json_object"}
+    assert not completions.requests[0].get("stream")
+    # The prompt's schema is generated from the model, not hand-written
+    assert schema_outline(JDAnalysis) in completions.prompts[0]
+
+    good = {"section": "skills", "original": "", "suggested": "Add Go", "reason": "Required", "severity": "high"}
+    bad = {**good, "suggested": "Add Terraform", "severity": "critical"}
+    completions = install_fake_llm(monkeypatch, [
+        json.dumps({"improvements": [good, bad], "missing_keywords": ["Go"]}),
+        json.dumps({"improvements": [{**bad, "severity": "high"}]})
+    ], latency=0)
+    match = MatchResult(ats_score=50, skill_overlap_percent=50.0, keyword_coverage=0.0)
+    suggestions = asyncio.run(ImprovementAgent().execute(ParsedResume(name="Jane Doe"), jd, match))
+
+    assert [i.suggested for i in suggestions.improvements] == ["Add Go", "Add Terraform"]
+    assert suggestions.missing_keywords == ["Go"]
+    assert completions.calls == 2
+    reask = completions.prompts[1]
+    assert "critical" in reask and "Add Go" not in reask and "Resume Data" not in reask
+    usage = get_usage()
+    assert usage["ImprovementAgent"]["reasks"] >= 1
+    assert 0 < usage["ImprovementAgent"]["parse_failure_rate"] <= 1
+
+def test_metrics_endpoint_reports_nodes_tokens_sources_and_caches(monkeypatch):
+    import agents.job_sources
+    import metrics
+    from agents import JobSearchAgent
+    from agents.job_sources import RemotiveSource
+
+    install_fake_llm(monkeypatch, PIPELINE_JSON, latency=0)
+    searcher = JobSearchAgent()
+    searcher._embedder = FakeEmbedder()
+    searcher.sources = [SlowSource("ok", 0), SlowSource("down", 0, fail=True), RemotiveSource()]
+    # The job board answers, but with an error status
+    monkeypatch.setattr(agents.job_sources, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503))))
+    nodes_before = metrics.NODE_LATENCY.count("match_node")
+    errors_before = (metrics.JOB_SOURCE_ERRORS.value("down", "ConnectTimeout"), metrics.JOB_SOURCE_ERRORS.value("Remotive", "503"))
+
+    async def run():
+        await searcher.execute(ParsedResume(skills={"languages": ["Python"]}))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post(
+                "/api/analyze/full",
+                files={"file": ("resume.txt", b"Jane Doe\nPython developer", "text/plain")},
+                data={"jd_text": "Backend Engineer, Python"}
+            )
+            return await client.get("/metrics")
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert metrics.NODE_LATENCY.count("match_node") == nodes_before + 1
+    assert metrics.JOB_SOURCE_ERRORS.value("down", "ConnectTimeout") == errors_before[0] + 1
+    assert metrics.JOB_SOURCE_ERRORS.value("Remotive", "503") == errors_before[1] + 1
+    assert 'resumex_node_duration_seconds_bucket{node="improve_node",le="+Inf"}' in body
+    assert 'resumex_llm_prompt_tokens_total{agent="JDAnalyzerAgent",model="' in body
+    assert 'resumex_job_source_duration_seconds_count{source="ok"}' in body
+    assert 'resumex_embedding_batch_size_count{caller="job_search"}' in body
+    assert 'resumex_cache_hit_ratio{cache="llm_response"}' in body
+
+    histogram = metrics.Histogram("resumex_test_overhead_seconds", "Benchmark only", ("label",))
+    metrics._metrics.remove(histogram)
+    start = time.perf_counter()
+    for _ in range(10000):
+        histogram.observe("x", value=0.02)
+    assert (time.perf_counter() - start) / 10000 < 5e-6
+
+def test_app_runs_offline_against_fake_groq_and_job_boards(monkeypatch, tmp_path):
+    from groq import AsyncGroq
+    from agents.job_sources import RedirectTransport
+    from agents.registry import get_agent
+    from benchmarks.fake_services import Cassette, create_groq_app, create_job_board_app, job_board_key
+
+    settings = get_settings()
+    for key in ("adzuna_app_id", "adzuna_api_key", "jsearch_api_key"):
+        monkeypatch.setattr(settings, key, "offline")
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "job_index_enabled", False)
+    monkeypatch.setattr(agents.governor, "_governor", agents.governor.LLMGovernor(base_delay=0.01))
+
+    # Every fourth LLM call fails with a 500 and is retried by the governor
+    groq_app = create_groq_app(base_latency=0, tokens_per_second=1e6, error_rate=0.25, error_status=500, seed=7)
+    llm_http = httpx.AsyncClient(transport=httpx.ASGITransport(app=groq_app))
+    monkeypatch.setattr(agents.base, "_llm_client", AsyncGroq(api_key="offline", base_url="http://groq", http_client=llm_http, max_retries=0))
+
+    cassette = Cassette(tmp_path / "cassette.json")
+    recorded = {"jobs": [{"title": "Recorded Role", "company_name": "Company R", "url": "https://jobs.example.com/r"}]}
+    cassette.put(job_board_key("remotive.com", "/api/remote-jobs", {"search": "Python Go SQL", "limit": "10"}), {"status": 200, "json": recorded})
+    jobs_http = httpx.AsyncClient(transport=RedirectTransport("http://jobs", httpx.ASGITransport(app=create_job_board_app(0, Cassette(cassette.path)))))
+    monkeypatch.setattr(agents.job_sources, "_http_client", jobs_http)
+    monkeypatch.setattr(get_agent("job_searcher"), "_embedder", FakeEmbedder())
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analysis = await client.post(
+                "/api/analyze/full",
+                files={"file": ("resume.txt", b"Alex Example\nPython developer", "text/plain")},
+                data={"jd_text": "Backend Engineer, Python"}
+            )
+            search = await client.post("/api/jobs/search-from-parsed", json={"skills": {"languages": ["Python", "Go", "SQL"]}})
+            fetched = await get_agent("job_searcher")._fetch_jobs("Python Go SQL")
+            return analysis, search, fetched
+
+    analysis, search, fetched = asyncio.run(run())
+
+    assert analysis.status_code == 200
+    assert analysis.json()["improvements"]["improvements"]
+    assert groq_app.state.calls > 4
+    assert len(search.json()["data"]["jobs"]) == 10
+    assert {job.source for job in fetched} == {"Adzuna", "JSearch", "Remotive"}
+    assert [job.title for job in fetched if job.source == "Remotive"] == ["Recorded Role"]
+
+def test_cold_import_is_lazy_and_ready_waits_for_warm_up(monkeypatch):
+    import subprocess
+    import sys
+    import agents.extraction
+    import agents.registry
+    import orchestrator.warmup
+    from orchestrator.graph import _graphs
+
+    heavy = ["langgraph", "groq", "fitz", "pdfplumber", "docx", "sentence_transformers"]
+    probe = f"import sys, main; print([m for m in {heavy!r} if m in sys.modules])"
+    loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == "[]"
+
+    monkeypatch.setattr(get_settings(), "extraction_executor", "thread")
+    monkeypatch.setattr(agents.extraction, "_pool", None)
+    monkeypatch.setattr(orchestrator.warmup, "_readiness", orchestrator.warmup.Readiness())
+    monkeypatch.setitem(agents.registry._models, "embedder", FakeEmbedder())
+    monkeypatch.setattr(agents.base, "_llm_client", SimpleNamespace())
+
+    async def probe_ready():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/ready")
+
+    assert asyncio.run(probe_ready()).status_code == 503
+    readiness = asyncio.run(orchestrator.warmup.warm_up())
+    response = asyncio.run(probe_ready())
+
+    assert response.status_code == 200
+    assert set(response.json()["steps"]) == {"graphs", "extraction_pool", "clients", "embedder"}
+    assert {"full_analysis", "resume_only", "job_search"} <= set(_graphs)
+
+    class BrokenEmbedder:
+        def encode(self, texts, **kwargs):
+            raise RuntimeError("model files missing")
+
+    monkeypatch.setitem(agents.registry._models, "embedder", BrokenEmbedder())
+    readiness = asyncio.run(orchestrator.warmup.warm_up(orchestrator.warmup.Readiness()))
+    assert not readiness.ready
+    assert readiness.steps["embedder"]["error"] == "model files missing"
+    agents.extraction.shutdown_extraction_pool()